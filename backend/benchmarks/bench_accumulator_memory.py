@@ -0,0 +1,114 @@
+"""Peak memory of accumulating, saving and serializing a region scan, by country count.
+
+Each run happens in a fresh subprocess, so its peak RSS belongs to that
+run alone. A run feeds synthetic country results (projects with KeyPoints
+and search results) into ResultsAccumulator or SpillingResultsAccumulator,
+saves them as a scan would, and encodes the response body: json.dumps of
+the whole document in memory mode, iter_json from the spill file in spill
+mode. RSS after imports is reported too, so the growth is visible.
+
+    python -m benchmarks.bench_accumulator_memory --countries 50 200 800 --projects 40
+"""
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def country_result(index, projects, search_results):
+    return {
+        "search_results": [
+            {"title": f"Article {index}-{i}", "url": f"https://news.example.com/{index}/{i}",
+             "snippet": "Developer announces a new solar park of 120 MW " * 3}
+            for i in range(search_results)
+        ],
+        "analysis": {
+            "Summary": {
+                "Major developers active in the market": [f"Developer {index % 50}"],
+                "Most promising projects": [f"Project {index}-0 - large capacity and early stage"],
+            },
+            "Detailed Project List": [
+                {"ProjectName": f"Project {index}-{i}", "Location": f"Region {i}",
+                 "Capacity_MW": f"{50 + i} MW", "Developer": f"Developer {(index + i) % 50}",
+                 "Timeline": "2027", "CurrentStatus": "Permitting", "category": "development",
+                 "source_url": f"https://news.example.com/{index}/{i}", "source_name": "Example News",
+                 "Date": "01/01/2025", "partners": ["Partner A", "Partner B"],
+                 "KeyPoints": [f"Key point {k} about the tender, grid connection and financing "
+                               f"of project {index}-{i}" for k in range(6)]}
+                for i in range(projects)
+            ],
+        },
+    }
+
+
+def child(mode, countries, projects, search_results):
+    from src.accumulator import ResultsAccumulator, SpillingResultsAccumulator
+    from src.store import ResultStore, iter_json
+
+    baseline = rss_mb()
+    root = tempfile.mkdtemp()
+    store = ResultStore(root)
+    accumulator_class = SpillingResultsAccumulator if mode == "spill" else ResultsAccumulator
+    accumulator = accumulator_class("bench", store)
+
+    start = time.perf_counter()
+    for i in range(countries):
+        result = country_result(i, projects, search_results)
+        accumulator.add_country_results(f"Country {i}", result["search_results"], result["analysis"])
+    accumulator.save_results()
+    accumulator.close()
+
+    # The response body, as build_region_result shapes it
+    document = {
+        "search_results": accumulator.search_results(),
+        "analysis": {"summary": accumulator.summary(),
+                     "projects_by_country": accumulator.projects_by_country()},
+    }
+    if mode == "spill":
+        size = sum(len(chunk) for chunk in iter_json(document))
+    else:
+        size = len(json.dumps(document, ensure_ascii=False, separators=(",", ":")))
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(root)
+    print(json.dumps({"baseline_mb": baseline, "peak_mb": rss_mb(), "seconds": elapsed, "body_mb": size / 1e6}))
+
+
+def report(mode, countries, stats):
+    print(f"{mode:<7} {countries:>6} countries   peak RSS {stats['peak_mb']:>8.1f} MB   "
+          f"growth {stats['peak_mb'] - stats['baseline_mb']:>8.1f} MB   "
+          f"body {stats['body_mb']:>7.1f} MB   {stats['seconds']:>6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--countries", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--projects", type=int, default=40, help="projects per country")
+    parser.add_argument("--search-results", type=int, default=30, help="search results per country")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "COUNTRIES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]), args.projects, args.search_results)
+        return
+
+    for countries in args.countries:
+        for mode in ("memory", "spill"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_accumulator_memory", "--child", mode, str(countries),
+                 "--projects", str(args.projects), "--search-results", str(args.search_results)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            report(mode, countries, json.loads(output.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
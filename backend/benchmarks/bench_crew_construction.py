@@ -0,0 +1,75 @@
+"""Micro-benchmark for per-country crew construction.
+
+Compares building an EnergyProjectsCrew with cold config caches (YAML
+parsed and rendered every time, as before caching) against the warm
+process-wide caches, and times the full create_crew() call.
+
+    python -m benchmarks.bench_crew_construction --iterations 200
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+
+# Client construction only needs a key to be present; no request is made
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SERPER_API_KEY", "benchmark")
+
+from src.config import loader
+from src.crew import EnergyProjectsCrew
+
+COUNTRIES = ["Croatia", "Lithuania", "Poland", "Spain", "Germany"]
+
+
+def clear_config_caches():
+    loader._render.cache_clear()
+    with loader._yaml_cache_lock:
+        loader._yaml_cache.clear()
+
+
+def time_calls(fn, iterations):
+    samples = []
+    for i in range(iterations):
+        country = COUNTRIES[i % len(COUNTRIES)]
+        start = time.perf_counter()
+        fn(country)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    # Nearest-rank percentile, so small runs still report one of their slowest samples
+    p95 = samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+    print(f"{name:<32} mean {statistics.mean(samples):>10.1f} µs   "
+          f"p50 {statistics.median(samples):>10.1f} µs   p95 {p95:>10.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--technology", default="solar")
+    args = parser.parse_args()
+
+    def cold(country):
+        clear_config_caches()
+        EnergyProjectsCrew(country=country, technology=args.technology)
+
+    def warm(country):
+        EnergyProjectsCrew(country=country, technology=args.technology)
+
+    def full(country):
+        EnergyProjectsCrew(country=country, technology=args.technology).create_crew()
+
+    # Prime the shared tool and LLM instances so only steady-state cost is measured
+    warm(COUNTRIES[0])
+
+    report("config + tools (cold caches)", time_calls(cold, args.iterations))
+    warm(COUNTRIES[0])
+    report("config + tools (warm caches)", time_calls(warm, args.iterations))
+    report("create_crew() (warm caches)", time_calls(full, max(1, args.iterations // 10)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""End-to-end region scans offline, against fake search, website and LLM backends.
+
+Starts benchmarks.fakes (Serper, scraped pages and the OpenAI API on one
+local server) and runs process_region for synthetic regions of increasing
+size in a fresh subprocess each, with its own empty caches and output
+directory. Everything in between is the application's real code: the crew
+or pipeline, tools, caches, rate limiters, accumulator and result store.
+The analyst replays recorded outputs (output/analysis_results_*.json by
+default) with each country's name swapped in.
+
+Per run it reports end-to-end throughput in countries per minute, requests
+made to each fake backend, projects found, peak RSS, and per-country stage
+latencies (p50/p95): waiting for a slot and finishing (parsing and
+accumulating the result) from the job's progress events; search, scrape and
+analysis from the first to the last request a country made to the fakes in
+that stage (in crew mode including the agents' LLM turns).
+
+    python -m benchmarks.bench_end_to_end --countries 1 10 50 200 --mode crew pipeline
+    python -m benchmarks.bench_end_to_end --countries 20 --llm-latency 1.0 --page-kb 60
+
+Fake API rate limits are raised so the backends' latency is what is
+measured; pass --real-rate-limits to keep the configured ones. Other
+settings (CREW_WORKERS, MAX_COUNTRIES_PER_REGION, PREPROCESS_ENABLED, ...)
+are taken from the environment as usual.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from benchmarks.fakes import load_recorded_analyses, start_fake_backends
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Stages timed by progress events: from one step (or the start of the scan) to another
+PROGRESS_STAGES = (
+    ("wait", None, "starting"),
+    ("finish", "analyzing", "complete"),
+    ("total", None, "complete"),
+)
+# Stages timed by the fake backends
+BACKEND_STAGES = ("search", "scrape", "analysis")
+
+
+def write_region_file(path, countries):
+    """Write a region file with one region, "bench", of the given number of countries; returns their names.
+
+    The real registry's countries come first, heaviest first, followed by
+    synthetic ones, so larger regions keep a realistic weight spread.
+    """
+    with open(BACKEND_DIR / 'src' / 'config' / 'regions.yaml', 'r', encoding='utf-8') as f:
+        real = yaml.safe_load(f)["countries"]
+    entries = sorted(real.items(), key=lambda item: -item[1].get("weight", 1))
+    table = {code: {"name": entry["name"], "weight": entry.get("weight", 1)} for code, entry in entries}
+    for i in range(len(table), countries):
+        table[f"Z{i:03d}"] = {"name": f"Country {i:03d}", "weight": 1}
+    codes = list(table)[:countries]
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump({"countries": {code: table[code] for code in codes},
+                        "regions": {"bench": {"countries": codes}}}, f, allow_unicode=True)
+    return [table[code]["name"] for code in codes]
+
+
+def rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def spread(values):
+    return {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+
+
+async def run_scan(technology):
+    """Scan the "bench" region as one job and time every country's progress steps"""
+    from src import main
+    from src.progress import current_job_id
+
+    job_id = f"bench-{os.getpid()}"
+    current_job_id.set(job_id)
+    steps = {}
+    start = time.perf_counter()
+
+    async def watch():
+        async for event in main.progress_broker.subscribe(job_id):
+            steps.setdefault(event["country"], {})[event["step"]] = time.perf_counter() - start
+
+    watcher = asyncio.ensure_future(watch())
+    await asyncio.sleep(0)
+    result = await main.process_region("bench", technology)
+    elapsed = time.perf_counter() - start
+    main.progress_broker.finish(job_id)
+    await watcher
+    main.crew_pool.shutdown()
+    return result, steps, elapsed
+
+
+def child(technology):
+    baseline = rss_mb()
+    result, steps, elapsed = asyncio.run(run_scan(technology))
+
+    stages = {}
+    for name, begin, end in PROGRESS_STAGES:
+        stages[name] = spread([times[end] - (times[begin] if begin else 0.0)
+                               for times in steps.values() if end in times and (begin is None or begin in times)])
+    projects_by_country = result["analysis"]["projects_by_country"]
+    if not isinstance(projects_by_country, dict):
+        # A spilling accumulator streams its projects
+        projects_by_country = dict(projects_by_country)
+    print(json.dumps({
+        "seconds": elapsed,
+        "completed": sum(1 for times in steps.values() if "complete" in times),
+        "errors": sum(1 for times in steps.values() if "error" in times),
+        "projects": sum(len(projects) for projects in projects_by_country.values()),
+        "stages": stages,
+        "baseline_mb": baseline,
+        "peak_mb": rss_mb(),
+    }))
+
+
+def report(mode, countries, stats, server):
+    per_minute = stats["completed"] / stats["seconds"] * 60 if stats["seconds"] else 0.0
+    print(f"{mode:<8} {countries:>4} countries  {stats['seconds']:>7.1f} s  {per_minute:>7.1f} countries/min  "
+          f"{stats['completed']:>4} done  {stats['errors']:>3} errors  {stats['projects']:>6} projects  "
+          f"peak RSS {stats['peak_mb']:>6.1f} MB (+{stats['peak_mb'] - stats['baseline_mb']:.1f})")
+    durations = server.stage_durations()
+    stages = {"wait": stats["stages"]["wait"],
+              **{stage: spread(durations.get(stage, [])) for stage in BACKEND_STAGES},
+              "finish": stats["stages"]["finish"], "total": stats["stages"]["total"]}
+    print("         stages (p50/p95 s): " + "  ".join(
+        f"{name} {s['p50']:.2f}/{s['p95']:.2f}" for name, s in stages.items()))
+    print("         backend requests:   " + "  ".join(
+        f"{route} {count}" for route, count in sorted(server.calls.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--countries", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--mode", nargs="+", choices=["crew", "pipeline"], default=["crew", "pipeline"])
+    parser.add_argument("--technology", default="solar")
+    parser.add_argument("--replay", nargs="*", default=None,
+                        help="recorded analysis files (default: output/analysis_results_*.json)")
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument("--page-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--results", type=int, default=8, help="results per search")
+    parser.add_argument("--pages", type=int, default=3, help="pages the scraper agent reads per country")
+    parser.add_argument("--page-kb", type=int, default=20, help="size of each scraped page")
+    parser.add_argument("--analysis-scale", type=int, default=1,
+                        help="repeat each recorded project list this many times")
+    parser.add_argument("--real-rate-limits", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.technology)
+        return
+
+    replay = [Path(p) for p in args.replay] if args.replay is not None \
+        else sorted((BACKEND_DIR / 'output').glob('analysis_results_*.json'))
+    recorded = load_recorded_analyses(replay)
+    print(f"Replaying {len(recorded)} recorded analyses" if recorded else "No recorded analyses, using synthetic ones")
+
+    for countries in args.countries:
+        for mode in args.mode:
+            workdir = tempfile.mkdtemp(prefix="bench-e2e-")
+            names = write_region_file(os.path.join(workdir, 'regions.yaml'), countries)
+            server = start_fake_backends(
+                args.technology, recorded, search_latency=args.search_latency,
+                page_latency=args.page_latency, llm_latency=args.llm_latency,
+                results_per_search=args.results, pages_per_crew=args.pages,
+                page_bytes=args.page_kb * 1024, analysis_scale=args.analysis_scale, countries=names,
+            )
+            env = {
+                **os.environ,
+                "EXECUTION_MODE": mode,
+                "SERPER_BASE_URL": server.url,
+                "SERPER_API_KEY": "benchmark",
+                "OPENAI_API_BASE": f"{server.url}/v1",
+                "OPENAI_BASE_URL": f"{server.url}/v1",
+                "OPENAI_API_KEY": "benchmark",
+                "REGIONS_FILE": os.path.join(workdir, 'regions.yaml'),
+                "CACHE_DIR": os.path.join(workdir, 'cache'),
+                "OUTPUT_DIR": os.path.join(workdir, 'output'),
+                "PROGRESS_BUFFER_SIZE": str(10 * countries + 100),
+                "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+                # Keep crewai and litellm from calling home or prompting
+                "CREWAI_DISABLE_TELEMETRY": "true",
+                "OTEL_SDK_DISABLED": "true",
+                "CREWAI_TESTING": "true",
+                "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+            }
+            if not args.real_rate_limits:
+                env.update(OPENAI_REQUESTS_PER_MINUTE="1000000", OPENAI_TOKENS_PER_MINUTE="1000000000",
+                           SERPER_REQUESTS_PER_MINUTE="1000000")
+            try:
+                completed = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_end_to_end", "--child", "--technology", args.technology],
+                    cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+                )
+                if completed.returncode != 0:
+                    print(f"{mode} run with {countries} countries failed:\n{completed.stderr[-2000:]}")
+                    continue
+                report(mode, countries, json.loads(completed.stdout.strip().splitlines()[-1]), server)
+            finally:
+                server.shutdown()
+                server.server_close()
+                shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
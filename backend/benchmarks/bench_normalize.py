@@ -0,0 +1,124 @@
+"""Benchmark project normalization over large synthetic project lists.
+
+Compares the previous implementation (normalize in process_country, then
+again in ResultsAccumulator, printing a line per project) against
+src.normalize, which normalizes once and also parses capacity into MW.
+The legacy path is timed with its prints sent to os.devnull and without
+them; the last column compares the single pass with legacy without prints.
+Most of the time saved against the printing path comes from dropping the
+prints, and the single pass spends part of its time parsing capacities,
+which the legacy code never did.
+
+    python -m benchmarks.bench_normalize --projects 10000 100000
+"""
+import argparse
+import os
+import random
+import time
+
+from src.normalize import normalize_projects, today
+
+STATUSES = ["Planned", "Under construction", "Permitting", "Operational"]
+UNITS = ["MW", "GW", "MWp", ""]
+
+
+def synthetic_projects(count, seed=7):
+    rng = random.Random(seed)
+    projects = []
+    for i in range(count):
+        capacity = f"{rng.randint(1, 900)}{rng.choice(['', '.5'])} {rng.choice(UNITS)}".strip()
+        if i % 2:
+            projects.append({
+                "ProjectName": f"Project {i}", "Location": f"Region {i % 40}",
+                "Capacity_MW": capacity, "Developer": f"Developer {i % 300}",
+                "Timeline": "2026", "CurrentStatus": rng.choice(STATUSES),
+                "source_url": f"https://news.example.com/{i}", "source_name": "Example News",
+                "category": "development", "Date": "01/01/2025",
+                "KeyPoints": [f"Point {k}" for k in range(6)], "partners": ["Partner A"],
+            })
+        else:
+            projects.append({
+                "name": f"Project {i}", "location": f"Region {i % 40}", "capacity": capacity,
+                "developer": f"Developer {i % 300}", "status": rng.choice(STATUSES),
+                "key_points": [f"Point {k}" for k in range(6)], "Partners": ["Partner B"],
+            })
+    return projects
+
+
+def legacy_standardize(project, country, date):
+    key_points = []
+    if "KeyPoints" in project and isinstance(project["KeyPoints"], list):
+        key_points = project["KeyPoints"]
+    elif "keyPoints" in project and isinstance(project["keyPoints"], list):
+        key_points = project["keyPoints"]
+    elif "key_points" in project and isinstance(project["key_points"], list):
+        key_points = project["key_points"]
+    partners = []
+    if "partners" in project and isinstance(project["partners"], list):
+        partners = project["partners"]
+    elif "Partners" in project and isinstance(project["Partners"], list):
+        partners = project["Partners"]
+    return {
+        "name": project.get("ProjectName") or project.get("name", "Unknown"),
+        "location": project.get("Location") or project.get("location", country),
+        "capacity": str(project.get("Capacity_MW") or project.get("capacity", "N/A")),
+        "developer": project.get("Developer") or project.get("developer", "Unknown"),
+        "investment": project.get("InvestmentValue") or project.get("investment", "N/A"),
+        "timeline": project.get("Timeline") or project.get("timeline", "N/A"),
+        "status": project.get("CurrentStatus") or project.get("status", "N/A"),
+        "source_url": project.get("source_url", ""),
+        "source_name": project.get("source_name", country),
+        "category": project.get("category", "development"),
+        "date": date,
+        "keyPoints": key_points,
+        "partners": partners,
+    }
+
+
+def legacy_pipeline(projects, country, out=None):
+    date = today()
+    once = []
+    for p in projects:
+        if out:
+            print(f"\nProcessing project: {p.get('ProjectName') or p.get('name', 'Unknown')}", file=out)
+        once.append(legacy_standardize(p, country, date))
+    twice = []
+    for p in once:
+        if out:
+            print(f"Processing project: {p.get('ProjectName', p.get('name', 'Unknown'))}", file=out)
+        twice.append(legacy_standardize(p, country, date))
+    return twice
+
+
+def new_pipeline(projects, country):
+    # process_country normalizes; the accumulator keeps the canonical dicts
+    return normalize_projects(normalize_projects(projects, country), country)
+
+
+def best_of(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'projects':>10} {'legacy+prints':>14} {'legacy':>11} {'single pass':>12} {'vs legacy':>10}")
+    with open(os.devnull, "w") as devnull:
+        for count in args.projects:
+            projects = synthetic_projects(count)
+            legacy_printing = best_of(legacy_pipeline, projects, "Croatia", devnull)
+            legacy = best_of(legacy_pipeline, projects, "Croatia")
+            new = best_of(new_pipeline, projects, "Croatia")
+            print(f"{count:>10} {legacy_printing * 1000:>11.1f} ms {legacy * 1000:>8.1f} ms "
+                  f"{new * 1000:>9.1f} ms {legacy / new:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
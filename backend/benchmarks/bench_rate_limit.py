@@ -0,0 +1,176 @@
+"""Rate limiter against a local fake provider that answers 429 above its limit.
+
+Starts an HTTP server that accepts --server-rps requests per second on
+Serper's /search and OpenAI's /v1/chat/completions endpoints and answers
+429 with Retry-After beyond that. The same number of concurrent calls is
+then made without a limiter and through src.ratelimit, and completed
+calls, errors seen by callers, 429s seen by the limiter and throughput are
+compared. LLM calls are made the way the app makes them: litellm
+completions over get_llm_http_client(), the shared OpenAI limiter's
+client installed as litellm's session. Finally a batch and an
+interactive caller compete for one limiter to show the priority ordering.
+
+    python -m benchmarks.bench_rate_limit --calls 200 --threads 16 --server-rps 20
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SERPER_API_KEY", "benchmark")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import httpx
+
+
+class FakeProvider(ThreadingHTTPServer):
+    """Counts requests per one-second window and rejects those over the limit"""
+
+    daemon_threads = True
+
+    def __init__(self, requests_per_second):
+        super().__init__(("127.0.0.1", 0), FakeProviderHandler)
+        self.requests_per_second = requests_per_second
+        self.lock = threading.Lock()
+        self.window = int(time.time())
+        self.in_window = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def admit(self):
+        with self.lock:
+            now = int(time.time())
+            if now != self.window:
+                self.window, self.in_window = now, 0
+            if self.in_window >= self.requests_per_second:
+                self.rejected += 1
+                return False
+            self.in_window += 1
+            self.accepted += 1
+            return True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.server.admit():
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.endswith("/chat/completions"):
+            body = {
+                "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": "fake",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "{}"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+            }
+        else:
+            body = {"organic": [{"title": "Fake result", "link": "https://example.com", "snippet": ""}]}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def run_calls(call, calls, threads):
+    errors = 0
+
+    def one(i):
+        nonlocal errors
+        try:
+            call(i)
+        except Exception:
+            errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(calls)))
+    return calls - errors, errors, time.perf_counter() - start
+
+
+def report(name, server, limiter, completed, errors, elapsed):
+    seen = limiter.stats()["rate_limited"] if limiter else "-"
+    print(f"{name:<28} completed {completed:>5}   caller errors {errors:>5}   "
+          f"429s from server {server.rejected:>5}   429s seen by limiter {seen!s:>5}   "
+          f"{completed / elapsed:>6.1f} calls/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--server-rps", type=int, default=20)
+    args = parser.parse_args()
+    # Configure the limiters slightly above the real limit so the adaptive backoff has work to do
+    configured_rpm = args.server_rps * 60 * 1.2
+    # The app's shared OpenAI limiter reads its limits from the settings, so set them before importing
+    os.environ["OPENAI_REQUESTS_PER_MINUTE"] = str(int(configured_rpm))
+    os.environ["OPENAI_TOKENS_PER_MINUTE"] = "1000000"
+    os.environ["RATE_LIMIT_MAX_RETRIES"] = "10"
+    import litellm
+
+    from src.cache.search import SerperSearchBackend
+    from src.clients import get_llm_http_client
+    from src.ratelimit import BATCH, INTERACTIVE, RateLimiter, get_rate_limiter
+
+    for name, limited in (("serper, no limiter", False), ("serper, rate limited", True)):
+        server = FakeProvider(args.server_rps)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        limiter = RateLimiter("serper", configured_rpm, max_retries=10) if limited else None
+        backend = SerperSearchBackend(base_url=server.url, limiter=limiter)
+        report(name, server, limiter, *run_calls(lambda i: backend(f"query {i}"), args.calls, args.threads))
+        server.shutdown()
+
+    for name, limited in (("openai, no limiter", False), ("openai, rate limited", True)):
+        server = FakeProvider(args.server_rps)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        if limited:
+            get_llm_http_client()
+            limiter = get_rate_limiter("openai")
+        else:
+            litellm.client_session = httpx.Client()
+            limiter = None
+
+        def complete(i):
+            # Each run has its own server URL, so litellm builds a client on the current session
+            litellm.completion(model="openai/gpt-4o-mini", messages=[{"role": "user", "content": f"prompt {i}"}],
+                               api_base=f"{server.url}/v1", api_key="benchmark", max_retries=0)
+
+        report(name, server, limiter, *run_calls(complete, args.calls, args.threads))
+        server.shutdown()
+
+    # Priority: interactive calls arriving behind a queue of batch calls are served first
+    limiter = RateLimiter("priority", requests_per_minute=1200)
+    waits = {INTERACTIVE: [], BATCH: []}
+
+    def acquire(priority):
+        waits[priority].append(limiter.acquire(priority=priority))
+
+    with ThreadPoolExecutor(max_workers=128) as pool:
+        for _ in range(100):
+            pool.submit(acquire, BATCH)
+        time.sleep(0.5)
+        for _ in range(20):
+            pool.submit(acquire, INTERACTIVE)
+    for priority, name in ((INTERACTIVE, "interactive"), (BATCH, "batch")):
+        samples = waits[priority]
+        print(f"priority {name:<19} mean wait {sum(samples) / len(samples):>6.2f} s over {len(samples)} calls")
+
+
+if __name__ == "__main__":
+    main()
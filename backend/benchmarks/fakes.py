@@ -0,0 +1,263 @@
+"""Deterministic local stand-ins for Serper, scraped websites and the OpenAI API.
+
+One HTTP server plays all three, so the application's own clients, caches,
+rate limiters and crewai's LLM calls run unchanged; only SERPER_BASE_URL and
+OPENAI_API_BASE point at it:
+
+- POST /search answers like Serper, with results linking to /pages/{i}?q=...
+- GET /pages/{i} serves an HTML article about the query, padded to a size
+- POST /v1/chat/completions scripts the crew's agents: the researcher calls
+  the search tool once, the scraper reads a number of the found pages, and
+  the analyst (and the pipeline's analysis calls) replays a recorded
+  analysis with the country name swapped in
+
+Every route waits a configurable latency before answering. Requests are
+counted per route, and given the scanned countries' names the server also
+records when each country's search, scrape and analysis requests started
+and ended, which gives per-stage latencies for crews and pipelines alike.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+SEARCH_TOOL = "Search the internet"
+SCRAPE_TOOL = "Read website content"
+
+# Where the country appears in the search and analysis task descriptions
+_SEARCH_COUNTRY = re.compile(r"projects in (.+?) from the last")
+_URL = re.compile(r"https?://[^\s\"'<>\]\)]+")
+_LINK = re.compile(r"Link: (\S+)")
+_TITLE = re.compile(r"Title: (.*)")
+
+# Recorded analyses are saved as analysis_results_{country}.json
+_RECORDED_NAME = re.compile(r"analysis_results_(?:[a-z0-9-]+_)?(.+)\.json$")
+
+
+def load_recorded_analyses(paths: List[Path]) -> List[Dict[str, Any]]:
+    """Recorded analyst outputs as {"country", "analysis"}, skipping unreadable files"""
+    recorded = []
+    for path in sorted(paths):
+        match = _RECORDED_NAME.search(path.name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                analysis = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if match and isinstance(analysis, dict) and analysis.get("Detailed Project List"):
+            recorded.append({"country": match.group(1), "analysis": analysis})
+    return recorded
+
+
+def synthetic_analysis(country: str, projects: int = 8) -> Dict[str, Any]:
+    return {
+        "Summary": {
+            "Major developers active in the market": [f"Developer {i}" for i in range(3)],
+            "Most promising projects": [f"{country} Project 0 - largest capacity in the pipeline"],
+        },
+        "Detailed Project List": [
+            {"ProjectName": f"{country} Project {i}", "Location": f"Region {i}", "Capacity_MW": 50 + 10 * i,
+             "Developer": f"Developer {i % 3}", "Timeline": "2027", "CurrentStatus": "Permitting",
+             "source_url": f"https://news.example.com/{i}", "source_name": "Example News",
+             "category": "development", "Date": "01/01/2025",
+             "KeyPoints": [f"Key point {k}" for k in range(6)], "partners": []}
+            for i in range(projects)
+        ],
+    }
+
+
+class FakeBackends(ThreadingHTTPServer):
+    """The fake services, counting requests per route and per scripted agent"""
+
+    daemon_threads = True
+
+    def __init__(self, technology: str, recorded: List[Dict[str, Any]],
+                 search_latency: float = 0.1, page_latency: float = 0.05, llm_latency: float = 0.2,
+                 results_per_search: int = 8, pages_per_crew: int = 3, page_bytes: int = 20000,
+                 analysis_scale: int = 1, countries: Sequence[str] = ()):
+        super().__init__(("127.0.0.1", 0), FakeBackendsHandler)
+        self.technology = technology
+        self.recorded = recorded
+        self.latency = {"search": search_latency, "page": page_latency, "llm": llm_latency}
+        self.results_per_search = results_per_search
+        self.pages_per_crew = pages_per_crew
+        self.page_bytes = page_bytes
+        self.analysis_scale = analysis_scale
+        self._analysis_country = re.compile(rf"data about (.+?) {re.escape(technology)} projects")
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        # Longest names first, so a name is never matched inside a longer one
+        self._countries = sorted(countries, key=len, reverse=True)
+        # country -> stage -> [first request start, last request end], in perf_counter seconds
+        self.stages: Dict[str, Dict[str, List[float]]] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self.calls[route] = self.calls.get(route, 0) + 1
+
+    def record(self, stage: str, text: str, start: float) -> None:
+        """Extend the country's stage window with a request that started at start and ends now"""
+        country = next((name for name in self._countries if name in text), None)
+        if country is None:
+            return
+        end = time.perf_counter()
+        with self._lock:
+            window = self.stages.setdefault(country, {}).setdefault(stage, [start, end])
+            window[0], window[1] = min(window[0], start), max(window[1], end)
+
+    def stage_durations(self) -> Dict[str, List[float]]:
+        """Seconds from each country's first to last request, per stage"""
+        with self._lock:
+            durations: Dict[str, List[float]] = {}
+            for stages in self.stages.values():
+                for stage, (start, end) in stages.items():
+                    durations.setdefault(stage, []).append(end - start)
+            return durations
+
+    # Serper
+
+    def search(self, query: str) -> Dict[str, Any]:
+        return {"organic": [
+            {"title": f"{query.title()} - article {i}", "link": f"{self.url}/pages/{i}?q={quote(query)}",
+             "snippet": f"News about {query}: a new project of {40 + 5 * i} MW was announced."}
+            for i in range(self.results_per_search)
+        ]}
+
+    # Websites
+
+    def page(self, index: str, query: str) -> str:
+        paragraphs = [
+            "<p>Accept cookies to continue. Privacy policy.</p>",
+            f"<h1>{query.title()}</h1>",
+        ]
+        i = 0
+        size = sum(len(p) for p in paragraphs)
+        while size < self.page_bytes:
+            paragraph = (f"<p>The {query} pipeline keeps growing: Developer {i % 7} announced a "
+                         f"{60 + i} MW project, article {index}, with construction planned for {2026 + i % 3} "
+                         f"and an investment of {30 + i} million euros, subject to the grid connection permit.</p>")
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+            i += 1
+        return "<html><body>" + "\n".join(paragraphs) + "</body></html>"
+
+    # OpenAI
+
+    def analysis(self, country: str) -> Dict[str, Any]:
+        if not self.recorded:
+            return synthetic_analysis(country)
+        index = int(hashlib.sha1(country.encode("utf-8")).hexdigest(), 16) % len(self.recorded)
+        recorded = self.recorded[index]
+        analysis = json.loads(json.dumps(recorded["analysis"]).replace(recorded["country"], country))
+        if self.analysis_scale > 1:
+            projects = analysis.get("Detailed Project List") or []
+            analysis["Detailed Project List"] = [
+                {**project, "ProjectName": f"{project.get('ProjectName')} {copy}" if copy else project.get("ProjectName")}
+                for copy in range(self.analysis_scale) for project in projects
+            ]
+        return analysis
+
+    def complete(self, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """The stage a chat completion request belongs to, and its scripted answer"""
+        system = "\n".join(str(m.get("content")) for m in messages if m.get("role") == "system")
+        conversation = "\n".join(str(m.get("content")) for m in messages)
+        steps = [str(m.get("content")) for m in messages if m.get("role") == "assistant"]
+        react = "Final Answer:" in system
+
+        if SEARCH_TOOL in system:
+            self.count("llm_research")
+            if not steps:
+                match = _SEARCH_COUNTRY.search(conversation)
+                query = f"{self.technology} energy projects {match.group(1) if match else ''}".strip()
+                return "search", f"Thought: I should search\nAction: {SEARCH_TOOL}\nAction Input: {json.dumps({'search_query': query})}"
+            observation = steps[-1]
+            sources = [{"title": title, "url": url, "description": title}
+                       for title, url in zip(_TITLE.findall(observation), _LINK.findall(observation))]
+            return "search", f"Thought: I now know the final answer\nFinal Answer: {json.dumps(sources)}"
+
+        if SCRAPE_TOOL in system:
+            self.count("llm_scrape")
+            user = "\n".join(str(m.get("content")) for m in messages if m.get("role") == "user")
+            urls = list(dict.fromkeys(_URL.findall(user)))[:self.pages_per_crew]
+            if len(steps) < len(urls):
+                return "scrape", (f"Thought: I should read the next page\nAction: {SCRAPE_TOOL}\n"
+                        f"Action Input: {json.dumps({'website_url': urls[len(steps)]})}")
+            details = [{"url": url, "details": "Project details extracted from the page"} for url in urls]
+            return "scrape", f"Thought: I now know the final answer\nFinal Answer: {json.dumps(details)}"
+
+        self.count("llm_analysis")
+        match = self._analysis_country.search(conversation)
+        answer = json.dumps(self.analysis(match.group(1) if match else "Unknown"), ensure_ascii=False)
+        return "analysis", f"Thought: I now know the final answer\nFinal Answer: {answer}" if react else answer
+
+
+class FakeBackendsHandler(BaseHTTPRequestHandler):
+    server: FakeBackends
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if not parts.path.startswith("/pages/"):
+            self._reply(404, b"", "text/plain")
+            return
+        start = time.perf_counter()
+        self.server.count("page")
+        time.sleep(self.server.latency["page"])
+        query = parse_qs(parts.query).get("q", [""])[0]
+        html = self.server.page(parts.path.rsplit("/", 1)[-1], query)
+        self._reply(200, html.encode("utf-8"), "text/html; charset=utf-8")
+        self.server.record("scrape", query, start)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.endswith("/search"):
+            self.server.count("search")
+            time.sleep(self.server.latency["search"])
+            self._reply(200, json.dumps(self.server.search(body.get("q", ""))).encode("utf-8"), "application/json")
+            self.server.record("search", body.get("q", ""), start)
+        elif self.path.endswith("/chat/completions"):
+            self.server.count("llm")
+            time.sleep(self.server.latency["llm"])
+            messages = body.get("messages") or []
+            stage, content = self.server.complete(messages)
+            prompt_tokens = sum(len(str(m.get("content"))) for m in messages) // 4
+            response = {
+                "id": "fake", "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                          "total_tokens": prompt_tokens + len(content) // 4},
+            }
+            self._reply(200, json.dumps(response).encode("utf-8"), "application/json")
+            self.server.record(stage, "\n".join(str(m.get("content")) for m in messages if m.get("role") == "user"),
+                               start)
+        else:
+            self._reply(404, b"", "text/plain")
+
+
+def start_fake_backends(technology: str, recorded: Optional[List[Dict[str, Any]]] = None,
+                        **options: Any) -> FakeBackends:
+    """Start the fake services on a free local port in a background thread"""
+    server = FakeBackends(technology, recorded or [], **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,15 +1,23 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
 import json
-from pathlib import Path
+import logging
+import os
+import tempfile
+from contextlib import nullcontext
 from datetime import datetime
+from pathlib import Path
+from src.config.settings import ACCUMULATOR_SPILL_COUNTRIES
+from src.normalize import extract_projects, normalize_projects
+from src.store import UNSCOPED_JOB, JsonStream, ResultStore, get_result_store
+
+logger = logging.getLogger(__name__)
 
 class ResultsAccumulator:
-    def __init__(self):
-        # Use absolute() instead of resolve() to get absolute path
-        self.output_dir = Path(__file__).parent.parent / 'output'
-        self.output_dir = self.output_dir.absolute()  # Get absolute path without resolving symlinks
-        self.output_dir.mkdir(exist_ok=True)
-        
+    def __init__(self, job_id: Optional[str] = None, store: Optional[ResultStore] = None):
+        # Results are saved under the job's own directory so concurrent scans never collide
+        self.job_id = job_id
+        self.store = store or get_result_store()
+
         # Initialize accumulator storage with the correct structure
         self.accumulated_search_results = []
         self.accumulated_analysis = {
@@ -28,19 +36,15 @@ class ResultsAccumulator:
         if country not in self.accumulated_analysis["summary"]["countries_analyzed"]:
             self.accumulated_analysis["summary"]["countries_analyzed"].append(country)
 
-        # Accumulate search results with country tag
+        # Tag search results with their country
         for result in search_results:
             result["country"] = country
-            self.accumulated_search_results.append(result)
+        standardized_projects = None
 
         # Process the analysis results
         if isinstance(analysis_results, dict):
             # Extract projects
-            projects = []
-            if "Detailed Project List" in analysis_results:
-                projects = analysis_results["Detailed Project List"]
-            elif "raw_result" in analysis_results and "projects" in analysis_results["raw_result"]:
-                projects = analysis_results["raw_result"]["projects"]
+            projects = extract_projects(analysis_results)
 
             # Extract most promising projects from Summary if available
             if "Summary" in analysis_results:
@@ -56,7 +60,6 @@ class ResultsAccumulator:
                 # Extract most promising projects - directly use the AI's reasoning
                 if "Most promising projects" in summary:
                     promising_projects = summary["Most promising projects"]
-                    print(f"\n🌟 Found promising projects for {country}: {promising_projects}")
                     
                     if isinstance(promising_projects, list) and promising_projects:
                         # Add country prefix to each project if not already included
@@ -70,65 +73,14 @@ class ResultsAccumulator:
                         
                         if country_projects:
                             self.accumulated_analysis["summary"]["most_promising_projects"].extend(country_projects)
-                            print(f"✅ Added {len(country_projects)} promising projects from {country}")
-                            print(f"Current most_promising_projects: {self.accumulated_analysis['summary']['most_promising_projects']}")
+                            logger.debug("🌟 Added %d promising projects from %s", len(country_projects), country)
                         else:
-                            print(f"⚠️ No valid promising projects found for {country}")
+                            logger.warning("⚠️ No valid promising projects found for %s", country)
                     else:
-                        print(f"⚠️ No promising projects list found for {country} or invalid format")
-
-            # Generate today's date in MM/DD/YYYY format - use this for ALL projects
-            today_date = datetime.now().strftime("%m/%d/%Y")
-            print(f"Using today's date for all projects: {today_date}")
+                        logger.warning("⚠️ No promising projects list found for %s or invalid format", country)
 
-            # Standardize and store projects
-            standardized_projects = []
-            for project in projects:
-                # Debug the project structure
-                print(f"Processing project: {project.get('ProjectName', project.get('name', 'Unknown'))}")
-                
-                # Check for KeyPoints with capital K as in tasks.yaml and analysis_results.json
-                key_points = []
-                if "KeyPoints" in project and isinstance(project["KeyPoints"], list):
-                    key_points = project["KeyPoints"]
-                elif "keyPoints" in project and isinstance(project["keyPoints"], list):
-                    key_points = project["keyPoints"]
-                else:
-                    # Also check for key_points in the original format from analysis_results.json
-                    if "key_points" in project and isinstance(project["key_points"], list):
-                        key_points = project["key_points"]
-                
-                # Ensure we have a valid list of key points
-                if not isinstance(key_points, list):
-                    key_points = []
-                
-                # Check for partners field with more flexibility
-                partners = []
-                if "partners" in project and isinstance(project["partners"], list):
-                    partners = project["partners"]
-                elif "Partners" in project and isinstance(project["Partners"], list):
-                    partners = project["Partners"]
-                
-                standardized_project = {
-                    "name": project.get("ProjectName", project.get("name", "Unknown")),
-                    "location": project.get("Location", project.get("location", country)),
-                    "capacity": str(project.get("Capacity_MW", project.get("capacity", "N/A"))),
-                    "developer": project.get("Developer", project.get("developer", "Unknown")),
-                    "investment": project.get("InvestmentValue", project.get("investment", "N/A")),
-                    "timeline": project.get("Timeline", project.get("timeline", "N/A")),
-                    "status": project.get("CurrentStatus", project.get("status", "N/A")),
-                    "source_url": project.get("source_url", ""),
-                    "source_name": project.get("source_name", country),
-                    # New fields from tasks.yaml
-                    "category": project.get("category", "development"),
-                    "date": today_date,  # Always use today's date
-                    "keyPoints": key_points,  # Use consistent lowercase keyPoints for frontend
-                    "partners": partners  # Add the partners field
-                }
-                standardized_projects.append(standardized_project)
-
-            # Store standardized projects for this country
-            self.accumulated_analysis["projects_by_country"][country] = standardized_projects
+            # Projects standardized by process_country are kept as they are
+            standardized_projects = normalize_projects(projects, country)
 
             # Update summary metrics
             for project in standardized_projects:
@@ -136,6 +88,35 @@ class ResultsAccumulator:
                 if project["developer"] != "Unknown":
                     self.accumulated_analysis["summary"]["major_developers"].add(project["developer"])
 
+        self._store_country(country, search_results, standardized_projects)
+
+    def _store_country(self, country: str, search_results: List[Dict],
+                       projects: Optional[List[Dict]]) -> None:
+        """Keep a country's search results and standardized projects (None if it had no analysis)"""
+        self.accumulated_search_results.extend(search_results)
+        if projects is not None:
+            self.accumulated_analysis["projects_by_country"][country] = projects
+
+    def iter_search_results(self) -> Iterator[Dict]:
+        return iter(self.accumulated_search_results)
+
+    def iter_projects_by_country(self) -> Iterator[Tuple[str, List[Dict]]]:
+        return iter(self.accumulated_analysis["projects_by_country"].items())
+
+    def summary(self) -> Dict:
+        """The summary aggregates, ready to be serialized"""
+        summary = dict(self.accumulated_analysis["summary"])
+        summary["major_developers"] = sorted(summary["major_developers"])
+        return summary
+
+    def search_results(self):
+        """All search results, as a list or a JsonStream for the response body"""
+        return self.accumulated_search_results
+
+    def projects_by_country(self):
+        """Projects keyed by country, as a dict or a JsonStream for the response body"""
+        return self.accumulated_analysis["projects_by_country"]
+
     def get_results(self) -> Dict:
         """Get the current accumulated results"""
         return {
@@ -143,20 +124,104 @@ class ResultsAccumulator:
             "analysis": self.accumulated_analysis
         }
 
+    def close(self) -> None:
+        """Called once the scan is saved; no more countries are added after this"""
+
     def save_results(self) -> None:
-        """Save accumulated results to files"""
-        # Convert set to list for JSON serialization
-        results = self.get_results()
-        results["analysis"]["summary"]["major_developers"] = list(
-            results["analysis"]["summary"]["major_developers"]
-        )
-
-        # Save accumulated analysis to file
-        output_path = self.output_dir / 'accumulated_analysis.json'
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        
-        # Also save accumulated search results to output directory
-        search_output_path = self.output_dir / 'search_results.json'
-        with open(search_output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.accumulated_search_results, f, ensure_ascii=False, indent=2) 
\ No newline at end of file
+        """Save accumulated results to the job's directory"""
+        analysis = {
+            "timestamp": self.accumulated_analysis["timestamp"],
+            "summary": self.summary(),
+            "projects_by_country": self.projects_by_country()
+        }
+        self.store.write(self.job_id, 'accumulated_analysis',
+                         {"search_results": self.search_results(), "analysis": analysis})
+        self.store.write(self.job_id, 'search_results', self.search_results())
+
+
+class SpillingResultsAccumulator(ResultsAccumulator):
+    """Accumulator for large regions that keeps only the summary in memory.
+
+    Each country's search results and projects are appended to a JSON Lines
+    file in the job's directory as they arrive. Saved files and response
+    bodies are streamed from that file country by country, so the whole
+    region is never held in memory at once.
+    """
+
+    def __init__(self, job_id: Optional[str] = None, store: Optional[ResultStore] = None):
+        super().__init__(job_id, store)
+        job_dir = self.store.job_dir(job_id or UNSCOPED_JOB)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        self.temporary = job_id is None
+        if not self.temporary:
+            self.path = job_dir / 'country_results.jsonl'
+        else:
+            # Runs outside of a job share a directory, so each gets its own file
+            fd, path = tempfile.mkstemp(dir=job_dir, prefix='country_results.', suffix='.jsonl')
+            os.close(fd)
+            self.path = Path(path)
+        self._log = open(self.path, 'w', encoding='utf-8')
+        # Open on the temporary file once it is deleted, for the reads that follow close()
+        self._reader: Optional[TextIO] = None
+        # File offsets of all records, and of each country's latest record with projects
+        # (kept at the position the country was first added, like projects_by_country)
+        self._offsets: List[int] = []
+        self._project_offsets: Dict[str, int] = {}
+
+    def _store_country(self, country: str, search_results: List[Dict],
+                       projects: Optional[List[Dict]]) -> None:
+        offset = self._log.tell()
+        self._log.write(json.dumps({"country": country, "search_results": search_results,
+                                    "projects": projects}, ensure_ascii=False) + "\n")
+        self._log.flush()
+        self._offsets.append(offset)
+        if projects is not None:
+            self._project_offsets[country] = offset
+
+    def _records(self, offsets: List[int]) -> Iterator[Dict]:
+        if not self._log.closed:
+            self._log.flush()
+        # Each record is sought before it is read, so readers can share the handle kept by close()
+        with nullcontext(self._reader) if self._reader is not None else open(self.path, 'r', encoding='utf-8') as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def iter_search_results(self) -> Iterator[Dict]:
+        for record in self._records(list(self._offsets)):
+            yield from record["search_results"]
+
+    def iter_projects_by_country(self) -> Iterator[Tuple[str, List[Dict]]]:
+        for record in self._records(list(self._project_offsets.values())):
+            yield record["country"], record["projects"]
+
+    def search_results(self) -> JsonStream:
+        return JsonStream(self.iter_search_results)
+
+    def projects_by_country(self) -> JsonStream:
+        return JsonStream(self.iter_projects_by_country, pairs=True)
+
+    def get_results(self) -> Dict:
+        """The whole document in memory; prefer the iter_ methods for large regions"""
+        analysis = dict(self.accumulated_analysis)
+        analysis["projects_by_country"] = dict(self.iter_projects_by_country())
+        return {"search_results": list(self.iter_search_results()), "analysis": analysis}
+
+    def close(self) -> None:
+        self._log.close()
+        if self.temporary and self._reader is None:
+            # Nothing else would ever remove it. The saved results and the response body
+            # are still read after close(), through a handle that keeps the data until
+            # the accumulator is dropped.
+            self._reader = open(self.path, 'r', encoding='utf-8')
+            try:
+                os.unlink(self.path)
+            except OSError as e:
+                logger.warning("⚠️ Could not delete spill file %s: %s", self.path, e)
+
+
+def create_accumulator(job_id: Optional[str], country_count: int) -> ResultsAccumulator:
+    """Accumulator for a scan of country_count countries, spilling to disk for large regions"""
+    if country_count >= ACCUMULATOR_SPILL_COUNTRIES:
+        return SpillingResultsAccumulator(job_id)
+    return ResultsAccumulator(job_id)
@@ -0,0 +1,71 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from src.cache.scrape import get_scrape_cache, normalize_url
+from src.cache.search import get_cached_search, organic_results
+
+logger = logging.getLogger(__name__)
+
+# One search per country covering every technology of a batch
+BATCH_DISCOVERY_QUERY = "{technologies} energy projects {country}"
+
+# Concurrent page downloads when warming the scrape cache for a country
+PREFETCH_WORKERS = 8
+
+
+def parse_technologies(value: str) -> List[str]:
+    """Technologies from a comma-separated list, without blanks or case-insensitive duplicates"""
+    technologies, seen = [], set()
+    for technology in value.split(","):
+        technology = technology.strip()
+        if technology and technology.lower() not in seen:
+            seen.add(technology.lower())
+            technologies.append(technology)
+    return technologies
+
+
+def technology_slug(technology: str) -> str:
+    """Technology name usable in job IDs and artifact names, e.g. "Offshore Wind" -> "offshore-wind" """
+    return re.sub(r"[^a-z0-9]+", "-", technology.lower()).strip("-") or "technology"
+
+
+def discover_shared_sources(country: str, technologies: List[str]) -> List[Dict[str, str]]:
+    """Sources for all technologies of a country from one search (blocking).
+
+    Every technology's crew gets the whole list, so an article found while
+    looking for solar projects is also seen by the storage crew.
+    """
+    query = BATCH_DISCOVERY_QUERY.format(technologies=" OR ".join(technologies), country=country)
+    response = get_cached_search().search(query, country, ",".join(sorted(t.lower() for t in technologies)))
+    sources, seen = [], set()
+    for result in organic_results(response):
+        key = normalize_url(result["url"])
+        if key not in seen:
+            seen.add(key)
+            sources.append(result)
+    return sources
+
+
+def prefetch_sources(sources: List[Dict[str, str]]) -> int:
+    """Scrape each source once into the scrape cache (blocking); returns the pages fetched.
+
+    The crews' scrape tool then reads these pages from the cache, and the
+    cache's in-flight sharing covers pages several crews find on their own.
+    """
+    scrape_cache = get_scrape_cache()
+
+    def fetch(url: str) -> bool:
+        try:
+            scrape_cache.fetch_text(url)
+            return True
+        except Exception as e:
+            logger.debug("Prefetch of %s failed: %s", url, e)
+            return False
+
+    urls = [source["url"] for source in sources]
+    if not urls:
+        return 0
+    with ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(urls))) as pool:
+        return sum(pool.map(fetch, urls))
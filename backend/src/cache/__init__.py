@@ -0,0 +1,4 @@
+# Persistent caches for search results, scraped pages and LLM responses
+from .store import SQLiteCache
+
+__all__ = ["SQLiteCache"]
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import LLM
+
+from src.cache.store import SQLiteCache
+from src.config.settings import CACHE_DIR, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL_SECONDS
+
+Messages = List[Dict[str, Any]]
+
+
+class LLMResponseCache:
+    """Persistent cache of chat completions for deterministic LLM calls.
+
+    Entries are keyed on the model parameters (the llm_string, which
+    includes the model name, temperature and stop words) and a hash of the
+    messages, so the same scraped input and task description return the
+    stored completion.
+    """
+
+    def __init__(self, cache: SQLiteCache):
+        self.cache = cache
+
+    @staticmethod
+    def cache_key(messages: Messages, llm_string: str) -> str:
+        llm_hash = hashlib.sha256(llm_string.encode("utf-8")).hexdigest()
+        prompt = json.dumps(messages, ensure_ascii=False, sort_keys=True, default=str)
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{llm_hash}:{prompt_hash}"
+
+    def lookup(self, messages: Messages, llm_string: str) -> Optional[str]:
+        return self.cache.get(self.cache_key(messages, llm_string))
+
+    def update(self, messages: Messages, llm_string: str, response: str) -> None:
+        self.cache.set(self.cache_key(messages, llm_string), response)
+
+    def invalidate(self, messages: Messages, llm_string: str) -> None:
+        """Drop the stored response for one prompt"""
+        self.cache.delete(self.cache_key(messages, llm_string))
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class CachedLLM(LLM):
+    """crewai LLM whose plain-text completions are memoized in an LLMResponseCache.
+
+    crewai keeps instances of its own LLM class as they are, while other
+    chat models (such as langchain's, with their cache) are converted and
+    lose everything but the model settings, so memoization lives here.
+    Calls with tools or function calling go straight to the model.
+    """
+
+    def __init__(self, response_cache: LLMResponseCache, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.response_cache = response_cache
+
+    def llm_string(self) -> str:
+        return json.dumps({
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            # crewai adds its executor's stop words to the shared LLM, in no particular order
+            "stop": sorted(self.stop or []),
+        }, sort_keys=True, default=str)
+
+    def call(self, messages: Union[str, Messages], tools: Optional[List[dict]] = None,
+             callbacks: Optional[List[Any]] = None, available_functions: Optional[Dict[str, Any]] = None,
+             **kwargs: Any) -> Union[str, Any]:
+        if tools or available_functions:
+            return super().call(messages, tools, callbacks, available_functions, **kwargs)
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        llm_string = self.llm_string()
+        cached = self.response_cache.lookup(messages, llm_string)
+        if cached is not None:
+            return cached
+        response = super().call(messages, tools, callbacks, available_functions, **kwargs)
+        if isinstance(response, str) and response:
+            self.response_cache.update(messages, llm_string, response)
+        return response
+
+
+_shared_llm_cache: Optional[LLMResponseCache] = None
+_shared_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide LLM response cache, created on first use"""
+    global _shared_llm_cache
+    with _shared_llm_cache_lock:
+        if _shared_llm_cache is None:
+            cache = SQLiteCache(CACHE_DIR / 'llm.sqlite3', LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_BYTES)
+            _shared_llm_cache = LLMResponseCache(cache)
+        return _shared_llm_cache
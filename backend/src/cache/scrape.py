@@ -0,0 +1,208 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from src.cache.store import SQLiteCache
+from src.config.settings import (
+    CACHE_DIR,
+    SCRAPE_CACHE_FRESH_SECONDS,
+    SCRAPE_CACHE_MAX_BYTES,
+    SCRAPE_CACHE_TTL_SECONDS,
+    SCRAPE_MAX_SESSIONS,
+    SCRAPE_POOL_SIZE_PER_DOMAIN,
+)
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref"}
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL so trivially different links share one cache entry"""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (scheme == "http" and parts.port == 80) and not (scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def extract_text(html: str) -> str:
+    """Extract page text the same way ScrapeWebsiteTool does"""
+    text = BeautifulSoup(html, "html.parser").get_text(" ")
+    text = re.sub("[ \t]+", " ", text)
+    return re.sub("\\s+\n\\s+", "\n", text)
+
+
+class ScrapeCache:
+    """Scraped page text cached by normalized URL and content hash, with HTTP revalidation.
+
+    Pages fetched within the fresh window are served without a request.
+    Older pages are revalidated with If-None-Match/If-Modified-Since; a 304,
+    or a 200 whose body hashes to the stored content, reuses the stored text
+    without parsing the page again.
+    """
+
+    def __init__(self, cache: SQLiteCache, fresh_seconds: float = SCRAPE_CACHE_FRESH_SECONDS,
+                 pool_size: int = SCRAPE_POOL_SIZE_PER_DOMAIN, timeout: float = 30,
+                 max_sessions: int = SCRAPE_MAX_SESSIONS):
+        self.cache = cache
+        self.fresh_seconds = fresh_seconds
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        # Least recently used domain first
+        self._sessions: "OrderedDict[str, requests.Session]" = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"fresh_hits": 0, "revalidated": 0, "unchanged": 0, "misses": 0,
+                       "shared": 0, "bytes_saved": 0}
+        # Fetches in progress by URL key, so concurrent crews scraping one page download it once
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def _count(self, name: str, bytes_saved: int = 0) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+            self._stats["bytes_saved"] += bytes_saved
+
+    def session_for(self, url: str) -> requests.Session:
+        """Session with its own connection pool for the URL's domain.
+
+        Only the max_sessions most recently used domains keep theirs; the
+        least recently used session is closed when a new domain needs one.
+        """
+        domain = (urlsplit(url).hostname or "").lower()
+        with self._sessions_lock:
+            session = self._sessions.get(domain)
+            if session is not None:
+                self._sessions.move_to_end(domain)
+            else:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                self._sessions[domain] = session
+                while len(self._sessions) > self.max_sessions:
+                    # A request still running on it finishes; its connections are just not reused
+                    _, evicted = self._sessions.popitem(last=False)
+                    evicted.close()
+            return session
+
+    def fetch_text(self, url: str) -> str:
+        """Return the extracted text of a page, downloading and parsing only when it changed.
+
+        Threads asking for a page that is already being fetched wait for that
+        fetch instead of starting their own.
+        """
+        url_key = "url:" + normalize_url(url)
+        with self._inflight_lock:
+            pending = self._inflight.get(url_key)
+            if pending is None:
+                future = self._inflight[url_key] = Future()
+        if pending is not None:
+            self._count("shared")
+            return pending.result()
+
+        try:
+            text = self._fetch_text(url, url_key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(text)
+            return text
+        finally:
+            with self._inflight_lock:
+                del self._inflight[url_key]
+
+    def _fetch_text(self, url: str, url_key: str) -> str:
+        entry = self.cache.get(url_key)
+        if entry is not None and time.time() - entry["fetched_at"] < self.fresh_seconds:
+            text = self.cache.get("content:" + entry["content_hash"])
+            if text is not None:
+                self._count("fresh_hits", entry["bytes"])
+                return text
+            entry = None
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session_for(url).get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            text = self.cache.get("content:" + entry["content_hash"])
+            if text is not None:
+                self._store(url_key, entry["content_hash"], entry["bytes"], response, entry)
+                self._count("revalidated", entry["bytes"])
+                return text
+            # The text was evicted; fetch the page unconditionally
+            response = self.session_for(url).get(url, timeout=self.timeout)
+        response.raise_for_status()
+
+        body = response.content
+        content_hash = hashlib.sha256(body).hexdigest()
+        text = self.cache.get("content:" + content_hash)
+        if text is not None:
+            self._count("unchanged")
+        else:
+            self._count("misses")
+            text = extract_text(response.text)
+            self.cache.set("content:" + content_hash, text)
+        self._store(url_key, content_hash, len(body), response, entry)
+        return text
+
+    def _store(self, url_key: str, content_hash: str, size: int,
+               response: requests.Response, previous: Optional[Dict[str, Any]]) -> None:
+        previous = previous or {}
+        self.cache.set(url_key, {
+            "content_hash": content_hash,
+            "bytes": size,
+            "etag": response.headers.get("ETag", previous.get("etag")),
+            "last_modified": response.headers.get("Last-Modified", previous.get("last_modified")),
+            "fetched_at": time.time(),
+        })
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({f"store_{k}": v for k, v in self.cache.stats().items()})
+        return stats
+
+
+_shared_scrape_cache: Optional[ScrapeCache] = None
+_shared_scrape_cache_lock = threading.Lock()
+
+
+def get_scrape_cache() -> ScrapeCache:
+    """Process-wide scrape cache, created on first use"""
+    global _shared_scrape_cache
+    with _shared_scrape_cache_lock:
+        if _shared_scrape_cache is None:
+            cache = SQLiteCache(CACHE_DIR / 'scrape.sqlite3', SCRAPE_CACHE_TTL_SECONDS, SCRAPE_CACHE_MAX_BYTES)
+            _shared_scrape_cache = ScrapeCache(cache)
+        return _shared_scrape_cache
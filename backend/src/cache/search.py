@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from src.cache.store import SQLiteCache
+from src.ratelimit import RateLimitedError, RateLimiter, get_rate_limiter, parse_retry_after
+from src.config.settings import (
+    CACHE_DIR,
+    SEARCH_CACHE_MAX_BYTES,
+    SEARCH_CACHE_TTL_SECONDS,
+    SERPER_BASE_URL,
+)
+
+SearchBackend = Callable[[str], Dict[str, Any]]
+
+
+class SerperSearchBackend:
+    """Calls the Serper search API and returns its raw JSON response"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = SERPER_BASE_URL,
+                 num_results: int = 10, timeout: float = 30,
+                 limiter: Optional[RateLimiter] = None):
+        self.api_key = api_key or os.getenv('SERPER_API_KEY')
+        self.base_url = base_url.rstrip('/')
+        self.num_results = num_results
+        self.timeout = timeout
+        self.limiter = limiter
+        self.session = requests.Session()
+
+    def _post(self, query: str) -> Dict[str, Any]:
+        response = self.session.post(
+            f"{self.base_url}/search",
+            headers={"X-API-KEY": self.api_key or "", "Content-Type": "application/json"},
+            data=json.dumps({"q": query, "num": self.num_results}),
+            timeout=self.timeout,
+        )
+        if response.status_code == 429:
+            raise RateLimitedError("Serper rate limit exceeded", parse_retry_after(response.headers))
+        response.raise_for_status()
+        return response.json()
+
+    def __call__(self, query: str) -> Dict[str, Any]:
+        if self.limiter is None:
+            return self._post(query)
+        return self.limiter.call(self._post, query)
+
+
+class CachedSearch:
+    """Search results cached on disk per country, technology and normalized query"""
+
+    def __init__(self, backend: SearchBackend, cache: SQLiteCache):
+        self.backend = backend
+        self.cache = cache
+
+    @staticmethod
+    def cache_key(query: str, country: str = "", technology: str = "") -> str:
+        normalized_query = " ".join(query.lower().split())
+        raw_key = json.dumps([country.lower(), technology.lower(), normalized_query])
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def search(self, query: str, country: str = "", technology: str = "",
+               refresh: bool = False) -> Dict[str, Any]:
+        """Return the raw search response, calling the backend only on a cache miss.
+
+        With refresh=True the backend is always called and the cache updated.
+        """
+        key = self.cache_key(query, country, technology)
+        if not refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        result = self.backend(query)
+        self.cache.set(key, result)
+        return result
+
+
+def organic_results(response: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Pull title/url/description entries out of a Serper response"""
+    return [
+        {
+            "title": item.get("title", ""),
+            "url": item.get("link", ""),
+            "description": item.get("snippet", ""),
+        }
+        for item in response.get("organic", [])
+        if item.get("link")
+    ]
+
+
+def format_results(response: Dict[str, Any]) -> str:
+    """Render results the same way SerperDevTool does so agent prompts are unchanged"""
+    entries = [
+        f"Title: {item['title']}\nLink: {item['url']}\nSnippet: {item['description']}\n---"
+        for item in organic_results(response)
+    ]
+    return "\nSearch results: " + "\n".join(entries) + "\n"
+
+
+_shared_search: Optional[CachedSearch] = None
+_shared_search_lock = threading.Lock()
+
+
+def get_cached_search() -> CachedSearch:
+    """Process-wide cached Serper search, created on first use"""
+    global _shared_search
+    with _shared_search_lock:
+        if _shared_search is None:
+            cache = SQLiteCache(CACHE_DIR / 'search.sqlite3', SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_BYTES)
+            _shared_search = CachedSearch(SerperSearchBackend(limiter=get_rate_limiter("serper")), cache)
+        return _shared_search
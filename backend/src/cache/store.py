@@ -0,0 +1,122 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+class SQLiteCache:
+    """Persistent key/value cache with a per-entry TTL and LRU eviction by total size.
+
+    Values are stored as JSON. A single connection is shared between
+    threads and guarded by a lock, which is plenty for the request rates of
+    the search, scrape and LLM caches built on top of it. The total size is
+    tracked as entries are written, so the table is only scanned when the
+    cache goes over budget.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl_seconds: float, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+        self._total_bytes = self._stored_bytes()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, evicting least recently used entries if needed"""
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            self._total_bytes += size - self._entry_size(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now + ttl, now),
+            )
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._total_bytes -= self._entry_size(key)
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._total_bytes = 0
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _entry_size(self, key: str) -> int:
+        row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _evict(self) -> None:
+        # Expired entries go first, then the least recently used until under budget.
+        # The total is recounted first, since other processes may share the file.
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        self._total_bytes = self._stored_bytes()
+        if self._total_bytes <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at")
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size of the cache"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
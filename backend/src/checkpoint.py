@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from src.batch import technology_slug
+from src.progress import current_job_id
+from src.store import ResultStore, get_result_store
+
+logger = logging.getLogger(__name__)
+
+# Crew tasks in execution order; a checkpoint holds the raw output of each finished one
+TASK_STAGES = ("search", "scrape", "analysis")
+
+
+class CountryCheckpoint:
+    """Progress of one country within a job, saved as each stage finishes.
+
+    Stored as the job artifact checkpoint_{technology}_{country}. It holds
+    the raw outputs of the finished crew tasks, the sources found, the
+    parsed analysis and finally the country's result, so a resumed job
+    skips whatever a previous attempt already finished.
+    """
+
+    def __init__(self, job_id: str, country: str, technology: str,
+                 store: Optional[ResultStore] = None):
+        self.job_id = job_id
+        self.country = country
+        self.technology = technology
+        self.store = store or get_result_store()
+        self.name = f"checkpoint_{technology_slug(technology)}_{country}"
+        self._data: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def for_current_job(cls, country: str, technology: str) -> Optional["CountryCheckpoint"]:
+        """Checkpoint in the job set in current_job_id; None outside of a job"""
+        job_id = current_job_id.get()
+        return cls(job_id, country, technology) if job_id is not None else None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            try:
+                stored = self.store.read(self.job_id, self.name)
+            except ValueError:
+                # Corrupt or unreadable: start the country over
+                stored = None
+            self._data = stored if isinstance(stored, dict) else {}
+            self._data.setdefault("stages", {})
+        return self._data
+
+    def _save(self, **changes: Any) -> None:
+        data = self.data
+        data.update(changes)
+        data.update(country=self.country, technology=self.technology, updated_at=time.time())
+        try:
+            self.store.write(self.job_id, self.name, data)
+        except Exception as e:
+            # A missing checkpoint only costs a rerun of this stage
+            logger.warning("⚠️ Could not checkpoint %s for %s: %s", self.country, self.job_id, e)
+
+    def stage_outputs(self) -> Dict[str, str]:
+        """Raw outputs of the crew tasks already finished, by stage"""
+        return dict(self.data["stages"])
+
+    def save_stage(self, stage: str, output: str) -> None:
+        self._save(stages={**self.data["stages"], stage: output})
+        logger.debug("📌 Checkpointed %s stage for %s", stage, self.country)
+
+    @property
+    def sources(self) -> List[Dict[str, str]]:
+        return self.data.get("sources") or []
+
+    def save_sources(self, sources: List[Dict[str, str]]) -> None:
+        self._save(sources=sources)
+
+    @property
+    def analysis(self) -> Optional[Dict]:
+        return self.data.get("analysis")
+
+    def save_analysis(self, analysis: Dict) -> None:
+        self._save(analysis=analysis)
+
+    @property
+    def result(self) -> Optional[Dict]:
+        """The country's finished result, if a previous attempt got that far"""
+        return self.data.get("result")
+
+    def complete(self, result: Dict) -> None:
+        self._save(result=result)
@@ -0,0 +1,69 @@
+import threading
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+import litellm
+
+from src.cache.llm import CachedLLM, get_llm_cache
+from src.cache.scrape import get_scrape_cache
+from src.cache.search import get_cached_search
+from src.preprocess import PagePreprocessor
+from src.ratelimit import RateLimitedTransport, get_rate_limiter
+from src.tools import CachedScrapeWebsiteTool, CachedSerperDevTool
+
+# Tools and LLM clients are stateless between calls, so every crew in the
+# process shares them and their pooled HTTP connections.
+
+_analyst_llm = None
+_analyst_llm_lock = threading.Lock()
+_llm_http_client: Optional[httpx.Client] = None
+_llm_http_client_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def get_search_tool(country: str, technology: str) -> CachedSerperDevTool:
+    """Search tool scoped to a country and technology for cache keys"""
+    return CachedSerperDevTool(search=get_cached_search(), country=country, technology=technology)
+
+
+@lru_cache(maxsize=1)
+def get_scrape_tool() -> CachedScrapeWebsiteTool:
+    return CachedScrapeWebsiteTool(scrape_cache=get_scrape_cache())
+
+
+def get_preprocessing_scrape_tool(preprocessor: PagePreprocessor) -> CachedScrapeWebsiteTool:
+    """Scrape tool for one crew that trims pages with the crew's own preprocessor"""
+    return CachedScrapeWebsiteTool(scrape_cache=get_scrape_cache(), preprocessor=preprocessor)
+
+
+def get_llm_http_client() -> httpx.Client:
+    """HTTP client whose requests go through the shared OpenAI rate limiter.
+
+    Also installed as litellm's client session: crewai turns every agent's
+    LLM into a litellm-backed crewai LLM, so this is where all agents' calls
+    are actually made. Must run before the first crew starts, since litellm
+    caches the OpenAI clients it builds.
+    """
+    global _llm_http_client
+    with _llm_http_client_lock:
+        if _llm_http_client is None:
+            _llm_http_client = httpx.Client(transport=RateLimitedTransport(get_rate_limiter("openai")))
+            litellm.client_session = _llm_http_client
+        return _llm_http_client
+
+
+def get_analyst_llm() -> CachedLLM:
+    """The data_analyst's chat model, created once per process"""
+    global _analyst_llm
+    get_llm_http_client()
+    with _analyst_llm_lock:
+        if _analyst_llm is None:
+            # Deterministic at temperature 0, so identical prompts reuse the stored completion
+            _analyst_llm = CachedLLM(
+                get_llm_cache(),
+                model="gpt-4o-mini",
+                #model="gpt-3.5-turbo",
+                temperature=0
+            )
+        return _analyst_llm
@@ -0,0 +1,72 @@
+import copy
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple
+
+import yaml
+
+CONFIG_DIR = Path(__file__).parent
+AGENTS_PATH = CONFIG_DIR / 'agents.yaml'
+TASKS_PATH = CONFIG_DIR / 'tasks.yaml'
+
+# Fields that contain {country}/{technology} placeholders
+TASK_TEMPLATE_FIELDS = ('description', 'expected_output')
+AGENT_TEMPLATE_FIELDS = ('role', 'goal', 'backstory')
+
+logger = logging.getLogger(__name__)
+
+_yaml_cache: Dict[Path, Tuple[Tuple[int, int], Dict]] = {}
+_yaml_cache_lock = threading.Lock()
+
+
+def _file_version(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_yaml(path: Path) -> Tuple[Tuple[int, int], Dict]:
+    """Parse a YAML file once and reuse it until the file changes on disk"""
+    version = _file_version(path)
+    with _yaml_cache_lock:
+        cached = _yaml_cache.get(path)
+        if cached is not None and cached[0] == version:
+            return cached
+    with open(path, 'r') as f:
+        parsed = yaml.safe_load(f)
+    with _yaml_cache_lock:
+        _yaml_cache[path] = (version, parsed)
+    return version, parsed
+
+
+def _render_section(section: Dict, fields: Tuple[str, ...], country: str, technology: str) -> Dict:
+    rendered = copy.deepcopy(section)
+    for key, entry in rendered.items():
+        for field in fields:
+            if field in entry:
+                try:
+                    entry[field] = entry[field].format(country=country, technology=technology)
+                except KeyError as e:
+                    logger.error("❌ Error formatting %s %s: %s", key, field, e)
+                    raise
+    return rendered
+
+
+@lru_cache(maxsize=512)
+def _render(agents_version: Tuple[int, int], tasks_version: Tuple[int, int],
+            country: str, technology: str) -> Tuple[Dict, Dict]:
+    # The file versions are part of the cache key, so edited YAML renders afresh
+    agents = _render_section(load_yaml(AGENTS_PATH)[1], AGENT_TEMPLATE_FIELDS, country, technology)
+    tasks = _render_section(load_yaml(TASKS_PATH)[1], TASK_TEMPLATE_FIELDS, country, technology)
+    return agents, tasks
+
+
+def render_config(country: str, technology: str) -> Tuple[Dict, Dict]:
+    """Agent and task configuration rendered for a country and technology.
+
+    The returned dicts are shared between callers and must not be modified.
+    """
+    agents_version = load_yaml(AGENTS_PATH)[0]
+    tasks_version = load_yaml(TASKS_PATH)[0]
+    return _render(agents_version, tasks_version, country, technology)
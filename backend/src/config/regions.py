@@ -1,8 +1,195 @@
-REGION_MAPPING = {
-    "USA": ["United States"],
-    "EU": [ "Croatia", "Lithuania"]  # Can easily add more countries later
-}
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+from src.config.loader import _file_version, load_yaml
+from src.config.settings import REGIONS_PATH
+
+logger = logging.getLogger(__name__)
+
+# Weight of countries the region file gives none
+DEFAULT_WEIGHT = 1.0
+
+
+class Country:
+    """A country of the registry: ISO code, name used in prompts and results, aliases and weight"""
+
+    __slots__ = ("code", "name", "aliases", "weight")
+
+    def __init__(self, code: str, name: str, aliases: List[str], weight: float):
+        self.code = code
+        self.name = name
+        self.aliases = aliases
+        self.weight = weight
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"code": self.code, "name": self.name, "aliases": self.aliases, "weight": self.weight}
+
+
+class RegionTable:
+    """One parsed version of the region file, with every region resolved to its countries"""
+
+    def __init__(self, raw: Any):
+        if not isinstance(raw, dict):
+            raise ValueError("Region file must be a mapping with 'countries' and 'regions'")
+        self.countries: Dict[str, Country] = {}
+        # Lower-cased names, aliases and codes -> country code / region name
+        self._country_keys: Dict[str, str] = {}
+        self._region_keys: Dict[str, str] = {}
+        self._region_entries: Dict[str, Dict] = {}
+        self.regions: Dict[str, List[str]] = {}
+        self.region_aliases: Dict[str, List[str]] = {}
+
+        for code, entry in (raw.get("countries") or {}).items():
+            if not isinstance(code, str) or not isinstance(entry, dict) or not entry.get("name"):
+                raise ValueError(f"Invalid country entry {code!r}: needs a string code and a name")
+            code = code.upper()
+            country = Country(code, str(entry["name"]), [str(a) for a in entry.get("aliases") or []],
+                              float(entry.get("weight", DEFAULT_WEIGHT)))
+            self.countries[code] = country
+            for key in [code, country.name] + country.aliases:
+                self._add_key(self._country_keys, key, code, "country")
+
+        for name, entry in (raw.get("regions") or {}).items():
+            entry = entry or {}
+            if not isinstance(name, str) or not isinstance(entry, dict):
+                raise ValueError(f"Invalid region entry {name!r}")
+            self._region_entries[name] = entry
+            self.region_aliases[name] = [str(a) for a in entry.get("aliases") or []]
+            for key in [name] + self.region_aliases[name]:
+                self._add_key(self._region_keys, key, name, "region")
+
+        for name in self._region_entries:
+            self.regions[name] = self._resolve(name, ())
+
+    @staticmethod
+    def _add_key(keys: Dict[str, str], key: str, target: str, kind: str) -> None:
+        key = str(key).strip().lower()
+        if keys.get(key, target) != target:
+            raise ValueError(f"{kind.capitalize()} name or alias {key!r} is used twice")
+        keys[key] = target
+
+    def _resolve(self, name: str, path: Tuple[str, ...]) -> List[str]:
+        """Country codes of a region and its nested regions, largest weight first"""
+        if name in path:
+            raise ValueError(f"Region {name!r} contains itself: {' > '.join(path + (name,))}")
+        entry = self._region_entries[name]
+        codes = set()
+        for code in entry.get("countries") or []:
+            code = str(code).upper()
+            if code not in self.countries:
+                raise ValueError(f"Region {name!r} lists unknown country {code!r}")
+            codes.add(code)
+        for nested in entry.get("regions") or []:
+            nested_name = self._region_keys.get(str(nested).strip().lower())
+            if nested_name is None:
+                raise ValueError(f"Region {name!r} includes unknown region {nested!r}")
+            codes.update(self._resolve(nested_name, path + (name,)))
+        return sorted(codes, key=lambda code: (-self.countries[code].weight, self.countries[code].name))
+
+    def country(self, name: str) -> Optional[Country]:
+        """A country by code, name or alias (case-insensitive)"""
+        code = self._country_keys.get(name.strip().lower())
+        return self.countries[code] if code else None
+
+    def canonical_name(self, region: str) -> str:
+        """The registry's name for a region, alias or single country; other input as given, trimmed"""
+        key = region.strip().lower()
+        name = self._region_keys.get(key)
+        if name is not None:
+            return name
+        code = self._country_keys.get(key)
+        return self.countries[code].name if code else region.strip()
+
+    def resolve(self, region: str) -> List[str]:
+        """Country names of a region, alias, or single country, largest weight first"""
+        key = region.strip().lower()
+        name = self._region_keys.get(key)
+        if name is not None:
+            return [self.countries[code].name for code in self.regions[name]]
+        code = self._country_keys.get(key)
+        return [self.countries[code].name] if code else []
+
+
+class RegionRegistry:
+    """Regions and countries from the region file, reloaded when the file changes.
+
+    Every lookup checks the file's modification time, so edits take effect
+    on the next scan. An edit that doesn't parse or validate is logged and
+    the previous version stays in use.
+    """
+
+    def __init__(self, path: Union[str, Path] = REGIONS_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._table: Optional[RegionTable] = None
+        self._version: Optional[Tuple[int, int]] = None
+
+    def table(self) -> RegionTable:
+        try:
+            version = _file_version(self.path)
+        except OSError as e:
+            if self._table is None:
+                raise
+            logger.error("❌ Region file unavailable, keeping the loaded regions: %s", e)
+            return self._table
+        with self._lock:
+            if version == self._version and self._table is not None:
+                return self._table
+            try:
+                table = RegionTable(load_yaml(self.path)[1])
+            except (yaml.YAMLError, ValueError, TypeError) as e:
+                if self._table is None:
+                    raise ValueError(f"Invalid region file {self.path}: {e}") from e
+                # Remember the broken version so the error is logged once per edit
+                self._version = version
+                logger.error("❌ Invalid region file, keeping the previous regions: %s", e)
+                return self._table
+            if self._table is not None:
+                logger.info("🌍 Reloaded regions: %d regions, %d countries",
+                            len(table.regions), len(table.countries))
+            self._table, self._version = table, version
+            return table
+
+    def countries_for_region(self, region: str) -> List[str]:
+        return self.table().resolve(region)
+
+    def country(self, name: str) -> Optional[Country]:
+        return self.table().country(name)
+
+    def canonical_name(self, region: str) -> str:
+        return self.table().canonical_name(region)
+
+    def weight(self, country: str) -> float:
+        found = self.country(country)
+        return found.weight if found else DEFAULT_WEIGHT
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Every region with its countries, for the API"""
+        table = self.table()
+        return [
+            {"name": name, "aliases": table.region_aliases[name],
+             "countries": [table.countries[code].to_dict() for code in codes]}
+            for name, codes in table.regions.items()
+        ]
+
+
+_shared_registry: Optional[RegionRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_region_registry() -> RegionRegistry:
+    """Process-wide region registry, created on first use"""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = RegionRegistry()
+        return _shared_registry
+
 
 def get_countries_for_region(region: str) -> list[str]:
-    """Get list of countries to search for a given region"""
-    return REGION_MAPPING.get(region, []) 
\ No newline at end of file
+    """Get list of countries to search for a given region, largest markets first"""
+    return get_region_registry().countries_for_region(region)
@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read a positive integer from the environment, falling back to default"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return default
+
+
+# Maximum number of countries processed at the same time across all requests
+MAX_CONCURRENT_COUNTRIES = _env_int("MAX_CONCURRENT_COUNTRIES", 16)
+
+# Maximum number of countries processed at the same time within one region scan
+MAX_COUNTRIES_PER_REGION = _env_int("MAX_COUNTRIES_PER_REGION", 8)
+
+# Number of worker threads available for blocking crew executions
+CREW_WORKERS = _env_int("CREW_WORKERS", 8)
+
+# Seconds a single crew execution may take before its country is reported as failed
+CREW_TIMEOUT_SECONDS = _env_int("CREW_TIMEOUT_SECONDS", 900)
+
+# Directory for persistent caches (search results, scraped pages, LLM responses)
+CACHE_DIR = Path(os.getenv("CACHE_DIR") or Path(__file__).parent.parent.parent / 'cache').absolute()
+
+# Search result cache: entry lifetime and total size before least-recently-used eviction
+SEARCH_CACHE_TTL_SECONDS = _env_int("SEARCH_CACHE_TTL_SECONDS", 24 * 60 * 60)
+SEARCH_CACHE_MAX_BYTES = _env_int("SEARCH_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+# Serper endpoint, overridable to point the search tool at a local stub
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL", "https://google.serper.dev")
+
+# Scrape cache: pages younger than the fresh window are served without any request,
+# older ones are revalidated with ETag/Last-Modified until the entry expires
+SCRAPE_CACHE_FRESH_SECONDS = _env_int("SCRAPE_CACHE_FRESH_SECONDS", 6 * 60 * 60)
+SCRAPE_CACHE_TTL_SECONDS = _env_int("SCRAPE_CACHE_TTL_SECONDS", 30 * 24 * 60 * 60)
+SCRAPE_CACHE_MAX_BYTES = _env_int("SCRAPE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+# Connections kept open per scraped domain
+SCRAPE_POOL_SIZE_PER_DOMAIN = _env_int("SCRAPE_POOL_SIZE_PER_DOMAIN", 4)
+# Domains whose sessions are kept; the least recently used one is closed beyond this
+SCRAPE_MAX_SESSIONS = _env_int("SCRAPE_MAX_SESSIONS", 256)
+
+# Analyst LLM response cache: entry lifetime and total size
+LLM_CACHE_TTL_SECONDS = _env_int("LLM_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60)
+LLM_CACHE_MAX_BYTES = _env_int("LLM_CACHE_MAX_BYTES", 128 * 1024 * 1024)
+
+# How a country is processed: "crew" (sequential crewai tasks) or "pipeline"
+# (search, scraping and analysis as overlapping stages, see src/pipeline.py)
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "crew").lower()
+
+# Pipeline mode: concurrent scrapers per country, queue bound between stages,
+# pages per analyst call and the characters of each page passed to the analyst
+PIPELINE_SCRAPE_WORKERS = _env_int("PIPELINE_SCRAPE_WORKERS", 4)
+PIPELINE_QUEUE_SIZE = _env_int("PIPELINE_QUEUE_SIZE", 16)
+PIPELINE_BATCH_SIZE = _env_int("PIPELINE_BATCH_SIZE", 4)
+PIPELINE_MAX_DOCUMENT_CHARS = _env_int("PIPELINE_MAX_DOCUMENT_CHARS", 8000)
+
+# Scraped pages are trimmed to their relevant passages before they reach the analyst:
+# tokens kept per page and per country (all pages of one crew or pipeline run)
+PREPROCESS_ENABLED = os.getenv("PREPROCESS_ENABLED", "true").lower() in ("1", "true", "yes")
+PREPROCESS_PAGE_TOKENS = _env_int("PREPROCESS_PAGE_TOKENS", 1500)
+PREPROCESS_TOKEN_BUDGET = _env_int("PREPROCESS_TOKEN_BUDGET", 12000)
+
+# Outbound API limits shared by all crews: requests and tokens per minute, and how
+# often a call rejected with 429 is retried before the error reaches the crew
+OPENAI_REQUESTS_PER_MINUTE = _env_int("OPENAI_REQUESTS_PER_MINUTE", 500)
+OPENAI_TOKENS_PER_MINUTE = _env_int("OPENAI_TOKENS_PER_MINUTE", 200000)
+SERPER_REQUESTS_PER_MINUTE = _env_int("SERPER_REQUESTS_PER_MINUTE", 300)
+RATE_LIMIT_MAX_RETRIES = _env_int("RATE_LIMIT_MAX_RETRIES", 5)
+
+# Progress events buffered per subscriber (oldest dropped first) and replayed to late subscribers
+PROGRESS_BUFFER_SIZE = _env_int("PROGRESS_BUFFER_SIZE", 100)
+
+# Region and country registry; edits to the file are picked up without a restart
+REGIONS_PATH = Path(os.getenv("REGIONS_FILE") or Path(__file__).parent / 'regions.yaml').absolute()
+
+# Directory for run outputs (per-country analysis files, accumulated results, job store)
+OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR") or Path(__file__).parent.parent.parent / 'output').absolute()
+
+# Indent stored JSON artifacts; off by default, use ResultStore.export for a readable copy
+OUTPUT_PRETTY = os.getenv("OUTPUT_PRETTY", "").lower() in ("1", "true", "yes")
+
+# Regions with at least this many countries keep per-country results in a JSON Lines file
+# next to the job's outputs instead of in memory
+ACCUMULATOR_SPILL_COUNTRIES = _env_int("ACCUMULATOR_SPILL_COUNTRIES", 25)
+
+# SQLite database holding background region scan jobs and their results
+JOBS_DB_PATH = Path(os.getenv("JOBS_DB_PATH") or OUTPUT_DIR / 'jobs.sqlite3').absolute()
+
+# Resume jobs left running by a shutdown from their country checkpoints on startup, instead of failing them
+RESUME_INTERRUPTED_JOBS = os.getenv("RESUME_INTERRUPTED_JOBS", "true").lower() in ("1", "true", "yes")
+
+# SQLite database of every project seen across runs, deduplicated
+PROJECT_INDEX_PATH = Path(os.getenv("PROJECT_INDEX_PATH") or OUTPUT_DIR / 'projects.sqlite3').absolute()
+
+# Logging: root level, per-module overrides ("src.crew=DEBUG,src.cache=WARNING") and format (text or json)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+# Raw crew outputs and extracted JSON are only written when enabled, to a size-capped rotating file
+LOG_PAYLOADS = os.getenv("LOG_PAYLOADS", "").lower() in ("1", "true", "yes")
+LOG_PAYLOADS_FILE = Path(os.getenv("LOG_PAYLOADS_FILE") or Path(__file__).parent.parent.parent / 'logs' / 'payloads.log').absolute()
+LOG_PAYLOADS_MAX_BYTES = _env_int("LOG_PAYLOADS_MAX_BYTES", 10 * 1024 * 1024)
+LOG_PAYLOADS_BACKUPS = _env_int("LOG_PAYLOADS_BACKUPS", 3)
+
+# crewai's own step-by-step console output for agents and crews
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", "").lower() in ("1", "true", "yes")
@@ -1,100 +1,71 @@
 from crewai import Agent, Crew, Process, Task
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
-from langchain.chat_models import ChatOpenAI
-import yaml
-import json
-import os
-from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import logging
+from src.checkpoint import TASK_STAGES
+from src.clients import (
+    get_analyst_llm,
+    get_llm_http_client,
+    get_preprocessing_scrape_tool,
+    get_scrape_tool,
+    get_search_tool,
+)
+from src.config.loader import render_config
+from src.config.settings import CREW_VERBOSE, PREPROCESS_ENABLED
+from src.preprocess import PagePreprocessor
+
+logger = logging.getLogger(__name__)
 
 class EnergyProjectsCrew:
     """Crew for analyzing energy projects"""
 
-    def __init__(self, country: str, technology: str):
+    def __init__(self, country: str, technology: str,
+                 seed_sources: Optional[List[Dict[str, str]]] = None,
+                 completed_outputs: Optional[Dict[str, str]] = None,
+                 on_task_output: Optional[Callable[[str, str], None]] = None):
         self.country = country
         self.technology = technology
+        # Sources already found for this country (e.g. by a batch scan of other technologies)
+        self.seed_sources = seed_sources or []
+        # Raw outputs of tasks an interrupted run already finished, by stage; those tasks are skipped
+        self.completed_outputs = completed_outputs or {}
+        # Called with the stage name and raw output as each task finishes
+        self.on_task_output = on_task_output
         self.agents_config = {}
         self.tasks_config = {}
         self.load_config()
         self.setup_tools()
 
     def load_config(self):
-        """Load configuration from YAML files"""
+        """Load configuration rendered for this country and technology (cached per process)"""
         try:
-            print(f"\n📝 Loading configuration files for {self.country}")
-            
-            # Load agents config
-            agents_path = Path(__file__).parent / 'config' / 'agents.yaml'
-            with open(agents_path, 'r') as f:
-                self.agents_config = yaml.safe_load(f)
-            print("✅ Loaded agents config")
-
-            # Load tasks config
-            tasks_path = Path(__file__).parent / 'config' / 'tasks.yaml'
-            with open(tasks_path, 'r') as f:
-                self.tasks_config = yaml.safe_load(f)
-            print("✅ Loaded tasks config")
-
-            # Format task descriptions with country and technology
-            print("\n🔄 Formatting task descriptions")
-            for task_key, task in self.tasks_config.items():
-                if 'description' in task:
-                    try:
-                        task['description'] = task['description'].format(
-                            country=self.country,
-                            technology=self.technology
-                        )
-                        print(f"✅ Formatted {task_key} description")
-                    except KeyError as e:
-                        print(f"❌ Error formatting {task_key} description: {str(e)}")
-                        raise
-                if 'expected_output' in task:
-                    try:
-                        task['expected_output'] = task['expected_output'].format(
-                            country=self.country,
-                            technology=self.technology
-                        )
-                        print(f"✅ Formatted {task_key} expected output")
-                    except KeyError as e:
-                        print(f"❌ Error formatting {task_key} expected output: {str(e)}")
-                        raise
-
-            # Format agent configurations
-            print("\n🔄 Formatting agent configurations")
-            for agent_key, agent in self.agents_config.items():
-                for field in ['role', 'goal', 'backstory']:
-                    if field in agent:
-                        try:
-                            agent[field] = agent[field].format(
-                                country=self.country,
-                                technology=self.technology
-                            )
-                            print(f"✅ Formatted {agent_key} {field}")
-                        except KeyError as e:
-                            print(f"❌ Error formatting {agent_key} {field}: {str(e)}")
-                            raise
-
-        except Exception as e:
-            print(f"❌ Error in load_config: {str(e)}")
-            print("Full error details:")
-            import traceback
-            traceback.print_exc()
+            self.agents_config, self.tasks_config = render_config(self.country, self.technology)
+        except Exception:
+            logger.exception("❌ Error in load_config for %s", self.country)
             raise
 
     def setup_tools(self):
-        self.search_tool = SerperDevTool(api_key=os.getenv('SERPER_API_KEY'))
-        self.scrape_tool = ScrapeWebsiteTool()
+        # All agents' LLM calls, including crewai's default LLM, go through the OpenAI rate limiter
+        get_llm_http_client()
+        # Shared per process: repeated queries and unchanged pages are served from the caches
+        self.search_tool = get_search_tool(self.country, self.technology)
+        # Pages are trimmed to a per-country token budget before the scraper passes them on
+        self.preprocessor = PagePreprocessor(self.country, self.technology) if PREPROCESS_ENABLED else None
+        if self.preprocessor is not None:
+            self.scrape_tool = get_preprocessing_scrape_tool(self.preprocessor)
+        else:
+            self.scrape_tool = get_scrape_tool()
 
     def create_agents(self):
         """Creates the required agents for the crew"""
         try:
-            print("\n🤖 Creating agents")
+            logger.debug("🤖 Creating agents for %s", self.country)
             
             researcher = Agent(
                 role=self.agents_config['web_researcher']['role'],
                 goal=self.agents_config['web_researcher']['goal'],
                 backstory=self.agents_config['web_researcher']['backstory'],
                 tools=[self.search_tool],
-                verbose=True
+                verbose=CREW_VERBOSE
             )
 
             scraper = Agent(
@@ -102,7 +73,7 @@ class EnergyProjectsCrew:
                 goal=self.agents_config['web_scraper']['goal'],
                 backstory=self.agents_config['web_scraper']['backstory'],
                 tools=[self.scrape_tool],
-                verbose=True
+                verbose=CREW_VERBOSE
             )
       
             analyst = Agent(
@@ -112,41 +83,36 @@ class EnergyProjectsCrew:
                 Your key responsibilities:
                 1. Verify all data sources are reliable and accessible
                 2. Ensure all URLs are complete and working (starting with https://)""",
-                llm=ChatOpenAI(
-                    model="gpt-4o-mini",
-                    #model="gpt-3.5-turbo",
-                    temperature=0
-                ),
-                verbose=True
+                llm=get_analyst_llm(),
+                verbose=CREW_VERBOSE
             )
-            print("✅ Created analyst with GPT")
 
             return [researcher, scraper, analyst]
             
         except Exception as e:
-            print(f"❌ Error creating agents: {str(e)}")
+            logger.error("❌ Error creating agents: %s", e)
             raise
 
+    def seed_sources_prompt(self) -> str:
+        """Search task addendum listing sources that are already known for the country"""
+        if not self.seed_sources:
+            return ""
+        lines = "\n".join(f"- {source.get('title', '')}: {source['url']}"
+                           for source in self.seed_sources if source.get('url'))
+        return f"""
+
+                These sources were already found for {self.country}. Include the ones that are
+                relevant to {self.technology} projects before searching for more:
+{lines}
+                """
+
     def create_tasks(self, agents):
         """Creates the tasks for the crew"""
         try:
-            print("\n📋 Creating tasks")
-            
-            # Create output directory if it doesn't exist
-            # Use absolute path with parent.parent to ensure we're in the right location
-            output_dir = Path(__file__).parent.parent / 'output'
-            output_dir = output_dir.absolute()  # Get absolute path without resolving symlinks
-            output_dir.mkdir(exist_ok=True)
-            
-            # Use country-specific filenames in the output directory
-            search_output = f'output/search_results_{self.country}.json'
-            analysis_output = f'output/analysis_results_{self.country}.json'
-            
-            print(f"📂 Output directory: {output_dir}")
-            print(f"📄 Search output path: {search_output}")
-            print(f"📄 Analysis output path: {analysis_output}")
-            
-            # Create tasks with proper output paths
+            logger.debug("📋 Creating tasks for %s", self.country)
+
+            # Task outputs are not written to files here; process_country stores the
+            # parsed results in the job's directory
             search_task = Task(
                 description=self.tasks_config['search_task']['description'] + """
                 
@@ -159,38 +125,58 @@ class EnergyProjectsCrew:
                     },
                     ...
                 ]
-                """,
+                """ + self.seed_sources_prompt(),
                 agent=agents[0],
-                expected_output=self.tasks_config['search_task']['expected_output'],
-                output_file=str(search_output)
+                expected_output=self.tasks_config['search_task']['expected_output']
             )
-            print(f"✅ Created task for web_researcher with output: {search_output}")
 
             scrape_task = Task(
                 description=self.tasks_config['scraping_task']['description'],
                 agent=agents[1],
                 expected_output=self.tasks_config['scraping_task']['expected_output']
             )
-            print("✅ Created task for web_scraper")
 
             analysis_task = Task(
                 description=self.tasks_config['analysis_task']['description'],
                 agent=agents[2],
-                expected_output=self.tasks_config['analysis_task']['expected_output'],
-                output_file=str(analysis_output)
+                expected_output=self.tasks_config['analysis_task']['expected_output']
             )
-            print(f"✅ Created task for data_analyst with output: {analysis_output}")
 
-            return [search_task, scrape_task, analysis_task]
+            tasks = [search_task, scrape_task, analysis_task]
+            if self.on_task_output is not None:
+                for stage, task in zip(TASK_STAGES, tasks):
+                    task.callback = self.task_callback(stage)
+            return self.remaining_tasks(tasks)
             
         except Exception as e:
-            print(f"❌ Error creating tasks: {str(e)}")
+            logger.error("❌ Error creating tasks: %s", e)
             raise
 
+    def task_callback(self, stage: str):
+        def callback(output):
+            self.on_task_output(stage, str(getattr(output, "raw", output)))
+        return callback
+
+    def remaining_tasks(self, tasks):
+        """Tasks after the ones already finished, the first given the last finished output"""
+        done = 0
+        while done < len(tasks) - 1 and TASK_STAGES[done] in self.completed_outputs:
+            done += 1
+        if done == 0:
+            return tasks
+        previous_output = self.completed_outputs[TASK_STAGES[done - 1]]
+        logger.info("⏩ Resuming %s at the %s task", self.country, TASK_STAGES[done])
+        tasks[done].description += f"""
+
+                Output of the previous step, from an earlier run:
+{previous_output}
+                """
+        return tasks[done:]
+
     def create_crew(self):
         """Creates the energy projects analysis crew"""
         try:
-            print("\n👥 Creating crew")
+            logger.debug("👥 Creating crew for %s", self.country)
             agents = self.create_agents()
             tasks = self.create_tasks(agents)
             
@@ -198,13 +184,12 @@ class EnergyProjectsCrew:
                 agents=agents,
                 tasks=tasks,
                 process=Process.sequential,
-                verbose=True
+                verbose=CREW_VERBOSE
             )
-            print("✅ Successfully created crew")
             return crew
             
         except Exception as e:
-            print(f"❌ Error creating crew: {str(e)}")
+            logger.error("❌ Error creating crew: %s", e)
             raise
 
     def search_task(self, context):
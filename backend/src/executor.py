@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import MAX_CONCURRENT_COUNTRIES, MAX_COUNTRIES_PER_REGION
+
+logger = logging.getLogger(__name__)
+
+
+class RegionExecutor:
+    """Runs the countries of a region concurrently under per-region and global limits"""
+
+    def __init__(self, global_limit: int = MAX_CONCURRENT_COUNTRIES,
+                 region_limit: int = MAX_COUNTRIES_PER_REGION):
+        self.global_limit = global_limit
+        self.region_limit = region_limit
+        # Created lazily so the semaphore binds to the running event loop
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_global_semaphore(self) -> asyncio.Semaphore:
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.global_limit)
+        return self._global_semaphore
+
+    async def run(self, countries: List[str],
+                  worker: Callable[[str], Awaitable[Dict]]) -> AsyncIterator[Tuple[str, Dict]]:
+        """Yield (country, result) pairs in completion order.
+
+        Countries start in the order given; regions list their largest
+        markets first, so the longest runs don't start last and stretch
+        the tail of the scan.
+
+        A failing country yields {"error": ...} instead of raising, so one
+        country can never abort the rest of the region.
+        """
+        region_semaphore = asyncio.Semaphore(self.region_limit)
+        global_semaphore = self._get_global_semaphore()
+
+        async def run_country(country: str) -> Tuple[str, Dict]:
+            # Always acquire region before global so concurrent regions can't deadlock
+            async with region_semaphore:
+                async with global_semaphore:
+                    try:
+                        return country, await worker(country)
+                    except Exception as e:
+                        logger.exception("❌ Error processing %s", country)
+                        return country, {"error": str(e)}
+
+        tasks = [asyncio.ensure_future(run_country(country)) for country in countries]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The consumer stopped early (client disconnect, cancellation): drop the rest
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
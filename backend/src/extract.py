@@ -0,0 +1,129 @@
+import json
+import re
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# Characters that matter for bracket matching; everything else is skipped in C
+_STRUCTURAL = re.compile(r'[{}\[\]"\\]')
+_FENCED_BLOCK = re.compile(r"```[ \t]*(?:json|JSON)?[ \t]*\r?\n(.*?)```", re.DOTALL)
+_CLOSERS = {"}": "{", "]": "["}
+
+
+class ExtractionResult:
+    """Parsed JSON from a crew output, where it came from, or why nothing could be parsed"""
+
+    __slots__ = ("value", "source", "error")
+
+    def __init__(self, value: Any = None, source: Optional[str] = None, error: Optional[str] = None):
+        self.value = value
+        self.source = source
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _default_accept(value: Any) -> bool:
+    return isinstance(value, dict) or (isinstance(value, list) and bool(value)
+                                       and all(isinstance(item, dict) for item in value))
+
+
+def find_balanced_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of the outermost balanced {...} or [...] spans, in order.
+
+    One scan over the structural characters. Brackets inside JSON strings
+    are ignored, and a stray opening bracket in the surrounding prose never
+    closes, so it doesn't hide the objects that follow it.
+    """
+    spans = []
+    stack: List[Tuple[str, int]] = []
+    in_string = False
+    skip_to = -1
+    for match in _STRUCTURAL.finditer(text):
+        pos = match.start()
+        if pos < skip_to:
+            continue
+        char = match.group()
+        if in_string:
+            if char == "\\":
+                skip_to = pos + 2
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            # Quotes only matter inside a bracket; prose quotes are left alone
+            in_string = bool(stack)
+        elif char in "{[":
+            stack.append((char, pos))
+        elif char in _CLOSERS:
+            opener = _CLOSERS[char]
+            for depth in range(len(stack) - 1, -1, -1):
+                if stack[depth][0] == opener:
+                    spans.append((stack[depth][1], pos + 1))
+                    del stack[depth:]
+                    break
+    # Keep only outermost spans: a nested object is never the answer on its own
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    outermost = []
+    covered_to = -1
+    for start, end in spans:
+        if start >= covered_to:
+            outermost.append((start, end))
+            covered_to = end
+    return outermost
+
+
+def _iter_text_candidates(text: str) -> Iterator[Tuple[str, str]]:
+    for block in _FENCED_BLOCK.finditer(text):
+        yield "fenced", block.group(1)
+    for start, end in find_balanced_spans(text):
+        yield "balanced", text[start:end]
+
+
+def _structured_candidates(output: Any) -> Iterator[Tuple[str, Any]]:
+    """JSON crewai already parsed: the crew's output, then task outputs from last to first"""
+    yield "json_dict", getattr(output, "json_dict", None)
+    pydantic_output = getattr(output, "pydantic", None)
+    if pydantic_output is not None and hasattr(pydantic_output, "model_dump"):
+        yield "pydantic", pydantic_output.model_dump()
+    for task_output in reversed(getattr(output, "tasks_output", None) or []):
+        yield "task_json_dict", getattr(task_output, "json_dict", None)
+
+
+def extract_json(output: Any, accept: Optional[Callable[[Any], bool]] = None) -> ExtractionResult:
+    """Extract the analysis JSON from a CrewOutput (or plain string).
+
+    Structured outputs are used when crewai provides them. Otherwise fenced
+    code blocks and then balanced {...}/[...] spans of the raw text are
+    parsed in order, and the first value accepted by `accept` (by default
+    an object or a list of objects) wins.
+    """
+    accept = accept or _default_accept
+    for source, value in _structured_candidates(output):
+        if value is not None and accept(value):
+            return ExtractionResult(value, source)
+
+    text = getattr(output, "raw", None)
+    if not isinstance(text, str):
+        text = output if isinstance(output, str) else str(output)
+
+    tried = 0
+    last_error = None
+    seen = set()
+    for source, candidate in _iter_text_candidates(text):
+        candidate = candidate.strip()
+        if not candidate or candidate in seen:
+            continue
+        seen.add(candidate)
+        tried += 1
+        try:
+            value = json.loads(candidate)
+        except ValueError as e:
+            last_error = f"{source} candidate: {e}"
+            continue
+        if accept(value):
+            return ExtractionResult(value, source)
+        last_error = f"{source} candidate parsed to an unexpected {type(value).__name__}"
+
+    if tried == 0:
+        return ExtractionResult(error="No JSON object or array found in the output")
+    return ExtractionResult(error=f"None of {tried} JSON candidates was usable; last: {last_error}")
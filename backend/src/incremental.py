@@ -0,0 +1,69 @@
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.batch import technology_slug
+from src.cache.scrape import normalize_url
+from src.cache.search import get_cached_search, organic_results
+from src.store import write_json_atomic
+
+# Query used to detect whether a country has new sources since the last run
+DISCOVERY_QUERY = "{technology} energy projects {country}"
+
+
+def discover_sources(country: str, technology: str) -> List[Dict[str, str]]:
+    """Run a fresh discovery search for a country (blocking).
+
+    The cache is bypassed for the lookup but refreshed with the response, so
+    the crew's own identical query is served from it afterwards.
+    """
+    query = DISCOVERY_QUERY.format(technology=technology, country=country)
+    response = get_cached_search().search(query, country, technology, refresh=True)
+    return organic_results(response)
+
+
+def source_fingerprint(sources: List[Dict[str, str]]) -> str:
+    """Order-independent hash of the URLs and titles of a source list"""
+    entries = sorted(
+        (normalize_url(source["url"]), source.get("title", "").strip())
+        for source in sources
+    )
+    return hashlib.sha256(json.dumps(entries).encode("utf-8")).hexdigest()
+
+
+class SourceManifest:
+    """The sources and parsed analysis stored by the last run for one country and technology"""
+
+    def __init__(self, output_dir: Path, country: str, technology: str):
+        self.country = country
+        self.technology = technology
+        self.path = output_dir / f'sources_{technology_slug(technology)}_{country}.json'
+        # The technology comes from the request; never let a name reach outside the output directory
+        if self.path.resolve().parent != Path(output_dir).resolve():
+            raise ValueError(f"Invalid manifest name for {country!r} ({technology!r})")
+
+    def load(self) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def unchanged_analysis(self, fingerprint: str) -> Optional[Dict]:
+        """The stored analysis if the previous run saw exactly these sources"""
+        previous = self.load()
+        if previous and previous.get("fingerprint") == fingerprint and previous.get("analysis"):
+            return previous["analysis"]
+        return None
+
+    def save(self, fingerprint: str, sources: List[Dict[str, str]], analysis: Dict) -> None:
+        write_json_atomic(self.path, {
+            "timestamp": datetime.now().isoformat(),
+            "country": self.country,
+            "technology": self.technology,
+            "fingerprint": fingerprint,
+            "sources": sources,
+            "analysis": analysis
+        })
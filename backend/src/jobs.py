@@ -0,0 +1,255 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from src.config.regions import get_region_registry
+from src.progress import ProgressBroker, current_job_id, new_job_id
+from src.store import ResultStore, get_result_store
+
+logger = logging.getLogger(__name__)
+
+# Job states, in lifecycle order
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Artifact holding a completed job's result, next to the scan's other files
+RESULT_ARTIFACT = "result"
+
+
+class JobStore:
+    """SQLite-backed store of region scan jobs and their results.
+
+    Results are written as a job artifact and only referenced from the
+    database, so large scans are never held in a row or parsed back whole.
+    """
+
+    def __init__(self, path: Union[str, Path], results: Optional[ResultStore] = None):
+        self.path = Path(path)
+        self.results = results or get_result_store()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                region TEXT NOT NULL,
+                technology TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT,
+                result TEXT
+            )"""
+        )
+        # Scan options (e.g. incremental), kept so an interrupted job can be resumed as submitted
+        try:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN options TEXT")
+        except sqlite3.OperationalError:
+            pass  # column exists already
+        # Name of the artifact holding the result; older rows keep the result itself in `result`
+        try:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN result_artifact TEXT")
+        except sqlite3.OperationalError:
+            pass  # column exists already
+        # The most recent completed scan per region and technology, read by the results API
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS latest_runs (
+                region TEXT NOT NULL,
+                technology TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                finished_at REAL NOT NULL,
+                PRIMARY KEY (region, technology)
+            )"""
+        )
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def create(self, job_id: str, region: str, technology: str,
+               options: Optional[Dict[str, Any]] = None) -> None:
+        self._execute(
+            "INSERT INTO jobs (id, region, technology, status, created_at, options) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, region, technology, QUEUED, time.time(), json.dumps(options or {})),
+        )
+
+    def requeue(self, job_id: str) -> None:
+        """Queue a failed or interrupted job again under the same ID"""
+        self._execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, finished_at = NULL, error = NULL WHERE id = ?",
+            (QUEUED, job_id),
+        )
+
+    def mark_running(self, job_id: str) -> None:
+        self._execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                      (RUNNING, time.time(), job_id))
+
+    def complete(self, job_id: str, result: Dict) -> None:
+        # Results of a spilled accumulator are streamed from its file, not built as objects first
+        self.results.write(job_id, RESULT_ARTIFACT, {**result, "job_id": job_id})
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, result_artifact = ? WHERE id = ?",
+            (COMPLETED, time.time(), RESULT_ARTIFACT, job_id),
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._execute("UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                      (FAILED, time.time(), error, job_id))
+
+    def interrupted(self) -> List[str]:
+        """IDs of jobs left queued or running by a previous process, oldest first"""
+        rows = self._execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def mark_interrupted(self) -> int:
+        """Fail jobs left queued or running by a previous process"""
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status IN (?, ?)",
+            (FAILED, time.time(), "Interrupted by server restart", QUEUED, RUNNING),
+        )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status without the (possibly large) result"""
+        row = self._execute(
+            "SELECT id, region, technology, status, created_at, started_at, finished_at, error "
+            "FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_options(self, job_id: str) -> Dict[str, Any]:
+        row = self._execute("SELECT options FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or not row["options"]:
+            return {}
+        return json.loads(row["options"])
+
+    def result_path(self, job_id: str) -> Optional[Path]:
+        """File holding a completed job's result, or None for jobs stored before results were files"""
+        row = self._execute("SELECT result_artifact FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or not row["result_artifact"]:
+            return None
+        return self.results.path(job_id, row["result_artifact"])
+
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        """A completed job's result as objects; result_path() serves large results without parsing them"""
+        row = self._execute("SELECT result, result_artifact FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row["result_artifact"]:
+            return self.results.read(job_id, row["result_artifact"])
+        if row["result"] is None:
+            return None
+        result = json.loads(row["result"])
+        result["job_id"] = job_id
+        return result
+
+    @staticmethod
+    def _run_key(region: str, technology: str) -> Tuple[str, str]:
+        # "eu", "EU" and the region's aliases are all the same scan
+        return get_region_registry().canonical_name(region), technology.lower()
+
+    def set_latest_run(self, region: str, technology: str, job_id: str) -> None:
+        """Record a finished scan as the latest one for its region and technology"""
+        self._execute(
+            "INSERT OR REPLACE INTO latest_runs (region, technology, job_id, finished_at) "
+            "VALUES (?, ?, ?, ?)",
+            (*self._run_key(region, technology), job_id, time.time()),
+        )
+
+    def get_latest_run(self, region: str, technology: str) -> Optional[Dict[str, Any]]:
+        row = self._execute(
+            "SELECT region, technology, job_id, finished_at FROM latest_runs "
+            "WHERE region = ? AND technology = ?", self._run_key(region, technology)
+        ).fetchone()
+        return dict(row) if row else None
+
+
+JobKey = Tuple[str, str, str]
+
+
+class JobManager:
+    """Runs region scans in the background and coalesces identical in-flight requests"""
+
+    def __init__(self, store: JobStore, runner: Callable[..., Awaitable[Dict]],
+                 progress: ProgressBroker):
+        self.store = store
+        self.runner = runner
+        self.progress = progress
+        self._inflight: Dict[JobKey, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def job_key(region: str, technology: str, options: Dict[str, Any]) -> JobKey:
+        """Scans are only identical with the same options, e.g. a full scan never joins an incremental one"""
+        return region, technology.lower(), json.dumps(options, sort_keys=True, default=str)
+
+    def submit(self, region: str, technology: str, **options: Any) -> Tuple[str, bool]:
+        """Start a scan, or join the running one for the same region, technology and options.
+
+        Returns the job ID and whether the request was coalesced onto an existing job.
+        """
+        key = self.job_key(region, technology, options)
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return existing, True
+
+        job_id = new_job_id()
+        self.store.create(job_id, region, technology, options)
+        self._start(job_id, key, region, technology, options)
+        return job_id, False
+
+    def resume(self, job_id: str) -> Tuple[str, bool]:
+        """Run a failed or interrupted job again under its own ID.
+
+        Countries and stages the earlier attempt checkpointed are not run
+        again. Returns the job ID that will produce the result and whether
+        it is another job already running for the same scan.
+        """
+        job = self.store.get(job_id)
+        options = self.store.get_options(job_id)
+        key = self.job_key(job["region"], job["technology"], options)
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return existing, existing != job_id
+        self.store.requeue(job_id)
+        self._start(job_id, key, job["region"], job["technology"], options)
+        logger.info("⏩ Resuming job %s", job_id)
+        return job_id, False
+
+    def _start(self, job_id: str, key: JobKey, region: str,
+               technology: str, options: Dict[str, Any]) -> None:
+        self._inflight[key] = job_id
+        task = asyncio.ensure_future(self._run(job_id, key, region, technology, options))
+        self._tasks[job_id] = task
+
+    async def _run(self, job_id: str, key: JobKey, region: str,
+                   technology: str, options: Dict[str, Any]) -> None:
+        current_job_id.set(job_id)
+        try:
+            self.store.mark_running(job_id)
+            result = await self.runner(region, technology, **options)
+            # Writing the result artifact can take a while for large scans
+            await asyncio.to_thread(self.store.complete, job_id, result)
+        except Exception as e:
+            logger.exception("❌ Job %s failed", job_id)
+            self.store.fail(job_id, str(e))
+        finally:
+            self._inflight.pop(key, None)
+            self._tasks.pop(job_id, None)
+            self.progress.finish(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": len(self._inflight)}
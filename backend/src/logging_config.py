@@ -0,0 +1,82 @@
+import json
+import logging
+import logging.handlers
+from typing import Any
+
+from src.config.settings import (
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_PAYLOADS,
+    LOG_PAYLOADS_BACKUPS,
+    LOG_PAYLOADS_FILE,
+    LOG_PAYLOADS_MAX_BYTES,
+)
+
+# Raw crew outputs and other large payloads; never propagated to the console
+PAYLOAD_LOGGER = "src.payloads"
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _parse_module_levels(spec: str):
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            yield name.strip(), level.strip().upper()
+
+
+def configure_logging() -> None:
+    """Set up console logging and the opt-in payload log. Safe to call more than once."""
+    root = logging.getLogger()
+    if getattr(root, "_energy_projects_configured", False):
+        return
+
+    handler = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    for name, level in _parse_module_levels(LOG_LEVELS):
+        logging.getLogger(name).setLevel(level)
+
+    payload_logger = logging.getLogger(PAYLOAD_LOGGER)
+    payload_logger.propagate = False
+    if LOG_PAYLOADS:
+        LOG_PAYLOADS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        payload_handler = logging.handlers.RotatingFileHandler(
+            LOG_PAYLOADS_FILE, maxBytes=LOG_PAYLOADS_MAX_BYTES,
+            backupCount=LOG_PAYLOADS_BACKUPS, encoding="utf-8"
+        )
+        payload_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        payload_logger.addHandler(payload_handler)
+        payload_logger.setLevel(logging.DEBUG)
+    else:
+        payload_logger.setLevel(logging.CRITICAL + 1)
+
+    root._energy_projects_configured = True
+
+
+def log_payload(label: str, payload: Any) -> None:
+    """Write a raw payload to the payload log; nothing is formatted unless it is enabled"""
+    logger = logging.getLogger(PAYLOAD_LOGGER)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s\n%s", label, payload)
@@ -1,6 +1,7 @@
+import logging
 import warnings
 from pydantic import PydanticDeprecatedSince20
-from typing import List, Dict
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Set, Tuple
 import os
 from datetime import datetime
 
@@ -10,19 +11,69 @@ warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
 
 from dotenv import load_dotenv
 from src.crew import EnergyProjectsCrew
-from src.config.regions import get_countries_for_region
-from fastapi import FastAPI, HTTPException, Response
+from src.config.regions import get_countries_for_region, get_region_registry
+from src.config.settings import EXECUTION_MODE, JOBS_DB_PATH, OUTPUT_DIR, RESUME_INTERRUPTED_JOBS
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 import json
-from pathlib import Path
 from sse_starlette.sse import EventSourceResponse
 import asyncio
-from .accumulator import ResultsAccumulator
+from .accumulator import ResultsAccumulator, create_accumulator
+from .batch import discover_shared_sources, parse_technologies, prefetch_sources, technology_slug
+from .checkpoint import CountryCheckpoint
+from .executor import RegionExecutor
+from .workers import CrewWorkerPool
+from .cache.llm import get_llm_cache
+from .cache.scrape import get_scrape_cache
+from .cache.search import get_cached_search
+from .jobs import COMPLETED, FAILED, JobManager, JobStore
+from .extract import extract_json
+from .logging_config import configure_logging, log_payload
+from .normalize import extract_projects, normalize_projects
+from .singleflight import SingleFlight
+from .store import get_result_store, has_json_stream, iter_json
+from .project_index import get_project_index
+from .query import ResultsQuery
+from .pipeline import SEARCH_QUERIES, CountryPipeline
+from .preprocess import get_preprocess_totals, record_run
+from .ratelimit import BATCH, current_priority, rate_limiter_stats
+from .progress import ProgressBroker, current_job_id, new_job_id
+from .incremental import SourceManifest, discover_sources, source_fingerprint
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
-# Store progress updates
-progress_updates = []
+# Per-job progress channels for the /api/progress SSE stream
+progress_broker = ProgressBroker()
+
+# Shared across requests so the global concurrency limit applies to all region scans
+region_executor = RegionExecutor()
+
+# Bounded pool for blocking crew executions so the event loop stays responsive
+crew_pool = CrewWorkerPool()
+
+# Deduplicates concurrent process_country calls for the same country, technology and options
+country_flight = SingleFlight()
+
+
+def country_flight_key(country: str, technology: str, incremental: bool,
+                       seed_sources: Optional[List[Dict]] = None) -> Tuple:
+    """Only runs that do the same work are shared: a full scan never gets an incremental or seeded result"""
+    return (country, technology.lower(), incremental,
+            source_fingerprint(seed_sources) if seed_sources else None)
+
+# Background jobs, and the latest finished scan per region and technology
+job_store = JobStore(JOBS_DB_PATH)
+
+# Job IDs of the synchronous scans (/api/projects*) running in this process
+running_scans: Set[str] = set()
+
+# Read-only queries over stored scan results
+results_query = ResultsQuery(job_store, get_result_store())
 
 # Allow frontend (Next.js) to access backend
 app.add_middleware(
@@ -34,269 +85,313 @@ app.add_middleware(
 )
 
 async def send_progress_update(country: str, step: str):
-    progress_updates.append({"country": country, "step": step})
+    """Publish a progress event to the job the current task belongs to"""
+    job_id = current_job_id.get()
+    if job_id is not None:
+        progress_broker.publish(job_id, {"job_id": job_id, "country": country, "step": step})
 
-async def process_region(region: str, technology: str) -> Dict:
-    """Process all countries in a region"""
+async def run_checkpointed(country: str, technology: str,
+                           run: Callable[[], Awaitable[Dict]]) -> Dict:
+    """Run one country of the current job, or return its result from an earlier attempt of the job"""
+    checkpoint = CountryCheckpoint.for_current_job(country, technology)
+    if checkpoint is not None and checkpoint.result is not None:
+        logger.info("⏩ %s (%s) finished in an earlier attempt of this job", country, technology)
+        await send_progress_update(country, "resumed")
+        return checkpoint.result
+    result = await run()
+    if checkpoint is not None and "error" not in result:
+        checkpoint.complete(result)
+    return result
+
+async def iter_region_results(region: str, technology: str, accumulator: ResultsAccumulator,
+                              incremental: bool = False) -> AsyncIterator[Tuple[str, Dict]]:
+    """Process all countries in a region concurrently, yielding each country as it finishes"""
     countries = get_countries_for_region(region)
-    accumulator = ResultsAccumulator()
-    
-    for country in countries:
+
+    async def run_country(country: str) -> Dict:
         await send_progress_update(country, "starting")
+        # Concurrent scans asking for the same country, technology and options share one crew run
+        return await run_checkpointed(country, technology, lambda: country_flight.do(
+            country_flight_key(country, technology, incremental),
+            lambda: process_country(country, technology, incremental)
+        ))
+
+    # Each country's result is added to the accumulator as soon as it finishes
+    async for country, result in region_executor.run(countries, run_country):
         try:
-            # Process single country
-            result = await process_country(country, technology)
-            
-            # Add results to accumulator
             accumulator.add_country_results(
                 country=country,
                 search_results=result.get("search_results", []),
                 analysis_results=result.get("analysis", {})
             )
             
-            await send_progress_update(country, "complete")
+            await send_progress_update(country, "error" if "error" in result else "complete")
         except Exception as e:
             await send_progress_update(country, "error")
-            print(f"Error processing {country}: {str(e)}")
+            logger.error("Error processing %s: %s", country, e)
             continue
+        yield country, result
+
+def build_region_summary(accumulator: ResultsAccumulator) -> Dict:
+    """Summary section of the accumulated results"""
+    summary = accumulator.summary()
+    return {
+        "countries_analyzed": summary["countries_analyzed"],
+        "major_developers": summary["major_developers"],
+        "most_promising_projects": summary.get("most_promising_projects", [])
+    }
+
+async def index_region_results(accumulator: ResultsAccumulator, technology: str) -> None:
+    """Add a finished scan's projects to the historical project index"""
+    try:
+        counts = await asyncio.to_thread(get_project_index().add_projects,
+                                         accumulator.iter_projects_by_country(), technology)
+        logger.info("🗂️ Project index: %(added)d added, %(merged)d merged, %(skipped)d skipped", counts)
+    except Exception:
+        # The scan result is still valid without the history
+        logger.exception("❌ Could not update the project index")
+
+async def store_region_results(accumulator: ResultsAccumulator, region: str, technology: str) -> None:
+    """Save a finished scan and make it the latest result for its region and technology"""
+    # Spilled results are streamed from their file while saving, so keep that off the event loop
+    await asyncio.to_thread(accumulator.save_results)
+    accumulator.close()
+    await index_region_results(accumulator, technology)
+    if accumulator.job_id is not None:
+        job_store.set_latest_run(region, technology, accumulator.job_id)
+
+async def process_region(region: str, technology: str, incremental: bool = False) -> Dict:
+    """Process all countries in a region concurrently"""
+    accumulator = create_accumulator(current_job_id.get(), len(get_countries_for_region(region)))
+    async for _ in iter_region_results(region, technology, accumulator, incremental):
+        pass
 
     # Save final accumulated results
-    accumulator.save_results()
-    
-    # Return the properly structured response
-    final_results = accumulator.get_results()
+    await store_region_results(accumulator, region, technology)
+    return build_region_result(accumulator)
+
+def build_region_result(accumulator: ResultsAccumulator) -> Dict:
+    """The response body of a finished region scan.
+
+    For a spilling accumulator the search results and projects are
+    JsonStreams, read from its file while the response is written.
+    """
     return {
         "timestamp": datetime.now().isoformat(),
-        "search_results": final_results["search_results"],
+        "search_results": accumulator.search_results(),
         "analysis": {
             "timestamp": datetime.now().isoformat(),
-            "summary": {
-                "countries_analyzed": final_results["analysis"]["summary"]["countries_analyzed"],
-                "major_developers": list(final_results["analysis"]["summary"]["major_developers"]),
-                "most_promising_projects": final_results["analysis"]["summary"].get("most_promising_projects", [])
-            },
-            "projects_by_country": final_results["analysis"]["projects_by_country"]
+            "summary": build_region_summary(accumulator),
+            "projects_by_country": accumulator.projects_by_country()
         }
     }
 
-async def process_country(country: str, technology: str) -> Dict:
-    """Process a single country's data"""
+def json_response(result: Dict):
+    """A result as is, or streamed when it reads from a spilled accumulator"""
+    if has_json_stream(result):
+        return StreamingResponse(iter_json(result), media_type="application/json")
+    return result
+
+async def process_region_batch(region: str, technologies: List[str],
+                               incremental: bool = False) -> Dict:
+    """Scan a region for several technologies, sharing search and scrape work per country.
+
+    Each country gets one combined discovery search whose pages are scraped
+    once into the scrape cache; every technology's crew then starts from
+    those sources. Results are stored as one run per technology.
+    """
+    job_id = current_job_id.get()
+    countries = get_countries_for_region(region)
+    accumulators = {
+        technology: create_accumulator(f"{job_id}-{technology_slug(technology)}" if job_id else None,
+                                       len(countries))
+        for technology in technologies
+    }
+
+    async def run_country(country: str) -> Dict[str, Dict]:
+        await send_progress_update(country, "starting")
+        checkpoints = [CountryCheckpoint.for_current_job(country, t) for t in technologies]
+        sources = []
+        # A resumed job whose technologies all finished this country needs no discovery
+        if not all(c is not None and c.result is not None for c in checkpoints):
+            try:
+                sources = await asyncio.to_thread(discover_shared_sources, country, technologies)
+                fetched = await asyncio.to_thread(prefetch_sources, sources)
+                logger.info("🔗 %d shared sources for %s, %d pages prefetched", len(sources), country, fetched)
+            except Exception as e:
+                logger.warning("⚠️ Shared discovery failed for %s, crews search on their own: %s", country, e)
+
+        async def run_technology(technology: str) -> Dict:
+            return await run_checkpointed(country, technology, lambda: country_flight.do(
+                country_flight_key(country, technology, incremental, sources),
+                lambda: process_country(country, technology, incremental, seed_sources=sources)
+            ))
+
+        results = await asyncio.gather(*(run_technology(t) for t in technologies), return_exceptions=True)
+        return {
+            technology: result if not isinstance(result, Exception) else {"error": str(result)}
+            for technology, result in zip(technologies, results)
+        }
+
+    async for country, by_technology in region_executor.run(countries, run_country):
+        if "error" in by_technology:
+            by_technology = {technology: by_technology for technology in technologies}
+        for technology, result in by_technology.items():
+            try:
+                accumulators[technology].add_country_results(
+                    country=country,
+                    search_results=result.get("search_results", []),
+                    analysis_results=result.get("analysis", {})
+                )
+            except Exception as e:
+                logger.error("Error processing %s (%s): %s", country, technology, e)
+        failed = any("error" in result for result in by_technology.values())
+        await send_progress_update(country, "error" if failed else "complete")
+
+    results = {}
+    for technology, accumulator in accumulators.items():
+        await store_region_results(accumulator, region, technology)
+        results[technology] = build_region_result(accumulator)
+    return {"timestamp": datetime.now().isoformat(), "technologies": results}
+
+def run_crew(country: str, technology: str, seed_sources: Optional[List[Dict]] = None,
+             checkpoint: Optional[CountryCheckpoint] = None):
+    """Build and run the crew for one country (blocking, runs on a worker thread).
+
+    With a checkpoint, each task's output is saved as it finishes and tasks
+    an earlier attempt already finished are skipped.
+    """
+    logger.debug("🔧 Creating crew for %s", country)
+    energy_crew = EnergyProjectsCrew(
+        country=country, technology=technology, seed_sources=seed_sources,
+        completed_outputs=checkpoint.stage_outputs() if checkpoint else None,
+        on_task_output=checkpoint.save_stage if checkpoint else None
+    )
+    crew = energy_crew.create_crew()
     try:
-        print(f"\n📍 Starting process for {country}")
+        return crew.kickoff()
+    finally:
+        record_run(country, technology, energy_crew.preprocessor)
+
+async def process_country(country: str, technology: str, incremental: bool = False,
+                          seed_sources: Optional[List[Dict]] = None) -> Dict:
+    """Process a single country's data.
+
+    In incremental mode a discovery search runs first; if it returns the same
+    sources as the previous run, the stored analysis is reused and no crew runs.
+    seed_sources are passed to the crew's search task as already known sources.
+    Within a job, finished stages are checkpointed and reused when the job is resumed.
+    """
+    try:
+        logger.info("📍 Starting process for %s", country)
+        checkpoint = CountryCheckpoint.for_current_job(country, technology)
         await send_progress_update(country, "searching")
+
+        sources, fingerprint, manifest = [], None, None
+        if incremental:
+            manifest = SourceManifest(OUTPUT_DIR, country, technology)
+            try:
+                sources = await asyncio.to_thread(discover_sources, country, technology)
+                fingerprint = source_fingerprint(sources)
+            except Exception as e:
+                logger.warning("⚠️ Discovery search failed for %s, running full crew: %s", country, e)
+            if fingerprint:
+                previous_analysis = manifest.unchanged_analysis(fingerprint)
+                if previous_analysis is not None:
+                    logger.info("♻️ No new sources for %s, reusing previous analysis", country)
+                    await send_progress_update(country, "unchanged")
+                    standardized_result = standardize_country_result(previous_analysis, country)
+                    standardized_result["search_results"] = sources
+                    return standardized_result
         
-        print(f"🔧 Creating crew for {country}")
-        energy_crew = EnergyProjectsCrew(country=country, technology=technology)
-        crew = energy_crew.create_crew()
-        
-        print(f"🚀 Executing crew for {country}")
         await send_progress_update(country, "processing")
-        result = crew.kickoff()
-        
-        print("\n🔍 Raw Result Type:", type(result))
-        print("🔍 Raw Result Content:")
-        print("---START OF RAW RESULT---")
-        print(result)
-        print("---END OF RAW RESULT---")
-        
-        await send_progress_update(country, "analyzing")
+        if checkpoint is not None and checkpoint.analysis is not None:
+            logger.info("⏩ Reusing the checkpointed analysis for %s", country)
+            parsed_result = checkpoint.analysis
+            sources = sources or checkpoint.sources
+        elif EXECUTION_MODE == "pipeline":
+            logger.info("🚀 Running pipeline for %s", country)
+            # Analyst calls share the crew worker pool's concurrency limit and timeout;
+            # a resumed run scrapes the checkpointed sources without searching again
+            resumed_sources = checkpoint.sources if checkpoint is not None else []
+            pipeline = CountryPipeline(
+                country, technology, resumed_sources or seed_sources or sources,
+                run_analysis=crew_pool.run,
+                search_queries=() if resumed_sources else SEARCH_QUERIES,
+                on_searched=checkpoint.save_sources if checkpoint is not None else None
+            )
+            parsed_result = await pipeline.run()
+            if "error" in parsed_result:
+                # Nothing was analyzed: keep the checkpoint and manifest for a later run
+                logger.error("❌ Pipeline for %s failed: %s", country, parsed_result["error"])
+                return parsed_result
+            sources = sources or pipeline.sources
+            await send_progress_update(country, "analyzing")
+        else:
+            logger.info("🚀 Executing crew for %s", country)
+            # Crew construction and kickoff block, so both run on the crew worker pool
+            result = await crew_pool.run(run_crew, country, technology, seed_sources, checkpoint)
+            
+            log_payload(f"Raw crew result for {country} ({type(result).__name__})", result)
+            
+            await send_progress_update(country, "analyzing")
+            
+            # Use crewai's structured output when present, otherwise parse the raw text
+            extraction = extract_json(result)
+            if not extraction.ok:
+                logger.error("❌ Could not parse result for %s: %s", country, extraction.error)
+                return {"error": f"Could not parse result: {extraction.error}"}
+            parsed_result = extraction.value
+            logger.debug("✅ Parsed JSON for %s from %s output", country, extraction.source)
+        log_payload(f"Extracted JSON for {country}", parsed_result)
+        if checkpoint is not None and checkpoint.analysis is None:
+            checkpoint.save_analysis(parsed_result)
         
-        # Convert CrewOutput to string and parse
         try:
-            # Get the string representation of CrewOutput
-            result_str = str(result)
-            print("\n📝 Converting CrewOutput to string:")
-            print(result_str)
+            # Country artifacts belong to the job that ran the crew (the leader of a shared run)
+            store = get_result_store()
+            job_id = current_job_id.get()
+            slug = technology_slug(technology)
+            analysis_output_file = store.write(job_id, f'analysis_results_{slug}_{country}', parsed_result)
+            logger.debug("💾 Analysis results saved to: %s", analysis_output_file)
+            
+            # Save country-specific search results if available
+            search_results = []
+            if isinstance(parsed_result, dict) and "search_results" in parsed_result:
+                search_results = parsed_result["search_results"]
             
-            # Find the JSON content within the string
-            json_start = result_str.find('{')
-            json_end = result_str.rfind('}') + 1
+            # Always create a search results file, even if empty
+            search_output_file = store.write(job_id, f'search_results_{slug}_{country}', search_results)
+            logger.debug("💾 Search results saved to: %s", search_output_file)
             
-            if json_start >= 0 and json_end > json_start:
-                json_content = result_str[json_start:json_end]
-                print("\n🔍 Extracted JSON content:")
-                print(json_content)
-                
-                # Parse the JSON content
-                parsed_result = json.loads(json_content)
-                print("\n✅ Successfully parsed JSON")
-                
-                # Ensure output directory exists
-                output_dir = Path(__file__).parent.parent / 'output'
-                output_dir = output_dir.absolute()  # Get absolute path without resolving symlinks
-                output_dir.mkdir(exist_ok=True)
-                
-                # Save country-specific analysis results
-                analysis_output_file = output_dir / f'analysis_results_{country}.json'
-                with open(analysis_output_file, 'w', encoding='utf-8') as f:
-                    json.dump(parsed_result, f, ensure_ascii=False, indent=2)
-                print(f"\n💾 Analysis results saved to: {analysis_output_file}")
-                
-                # Save country-specific search results if available
-                search_results = []
-                if "search_results" in parsed_result:
-                    search_results = parsed_result["search_results"]
-                
-                # Always create a search results file, even if empty
-                search_output_file = output_dir / f'search_results_{country}.json'
-                with open(search_output_file, 'w', encoding='utf-8') as f:
-                    json.dump(search_results, f, ensure_ascii=False, indent=2)
-                print(f"\n💾 Search results saved to: {search_output_file}")
-                
-                # Standardize the result structure
-                standardized_result = standardize_country_result(parsed_result, country)
-                
-                return standardized_result
-            else:
-                print("\n❌ Could not find valid JSON content in the result")
-                return {"error": "Could not parse result"}
+            # Remember which sources produced this analysis for the next incremental run
+            if manifest is not None and fingerprint:
+                manifest.save(fingerprint, sources, parsed_result)
+            
+            # Standardize the result structure
+            standardized_result = standardize_country_result(parsed_result, country)
+            if sources:
+                standardized_result["search_results"] = sources
+            
+            return standardized_result
         except Exception as e:
-            print(f"\n❌ Error parsing result: {str(e)}")
+            logger.error("❌ Error saving result for %s: %s", country, e)
             return {"error": str(e)}
             
     except Exception as e:
-        print(f"\n❌ Error in process_country for {country}: {str(e)}")
+        logger.error("❌ Error in process_country for %s: %s", country, e)
         return {"error": str(e)}
 
-def standardize_project(project: Dict, country: str) -> Dict:
-    """Standardize project data structure"""
-    # Extract key points with flexibility for different field names
-    key_points = []
-    if "KeyPoints" in project and isinstance(project["KeyPoints"], list):
-        key_points = project["KeyPoints"]
-    elif "keyPoints" in project and isinstance(project["keyPoints"], list):
-        key_points = project["keyPoints"]
-    elif "key_points" in project and isinstance(project["key_points"], list):
-        key_points = project["key_points"]
-    
-    # Ensure we have a valid list
-    if not isinstance(key_points, list):
-        key_points = []
-    
-    # Check for partners with similar flexibility
-    partners = []
-    if "partners" in project and isinstance(project["partners"], list):
-        partners = project["partners"]
-    elif "Partners" in project and isinstance(project["Partners"], list):
-        partners = project["Partners"]
-    
-    # Always use today's date for all projects
-    today_date = datetime.now().strftime("%m/%d/%Y")
-    
-    if 'ProjectName' in project:
-        return {
-            "name": project.get("ProjectName", "Unknown"),
-            "location": project.get("Location", country),
-            "capacity": str(project.get("Capacity_MW", "N/A")),
-            "developer": project.get("Developer", "Unknown"),
-            "investment": project.get("InvestmentValue", "N/A"),
-            "timeline": project.get("Timeline", "N/A"),
-            "source_url": project.get("source_url", ""),
-            "source_name": project.get("source_name", country),
-            "status": project.get("CurrentStatus", "N/A"),
-            # New fields from tasks.yaml
-            "category": project.get("category", "development"),
-            "date": today_date,  # Always use today's date
-            "keyPoints": key_points,  # Use consistent lowercase keyPoints for frontend
-            "partners": partners  # Add the new partners field
-        }
-    return {
-        "name": project.get("name", "Unknown"),
-        "location": project.get("location", country),
-        "capacity": str(project.get("capacity", "N/A")),
-        "developer": project.get("developer", "Unknown"),
-        "investment": project.get("investment", "N/A"),
-        "timeline": project.get("timeline", "N/A"),
-        "source_url": project.get("source_url", ""),
-        "source_name": project.get("source_name", country),
-        "status": project.get("status", "N/A"),
-        # New fields from tasks.yaml
-        "category": project.get("category", "development"),
-        "date": today_date,  # Always use today's date
-        "keyPoints": key_points,  # Use consistent lowercase keyPoints for frontend
-        "partners": partners  # Add the new partners field
-    }
-
 def standardize_country_result(result: any, country: str) -> Dict:
     """Standardize the country result into a consistent format"""
     try:
-        print(f"\n🔍 Standardizing result for {country}")
-        print(f"Input result type: {type(result)}")
-        
-        standardized_projects = []
-        
-        # Handle different result structures
-        projects = []
-        print("\n📦 Extracting projects from result")
-        
-        if isinstance(result, list):
-            print("Result is a list, filtering for project entries")
-            projects = [p for p in result if isinstance(p, dict) and ('ProjectName' in p or 'name' in p)]
-            print(f"Found {len(projects)} projects in list")
-            
-        elif isinstance(result, dict):
-            print("Result is a dictionary, checking known structures")
-            if 'Detailed Project List' in result:
-                print("Found 'Detailed Project List' structure")
-                projects = result.get('Detailed Project List', [])
-            elif 'raw_result' in result and 'projects' in result['raw_result']:
-                print("Found 'raw_result.projects' structure")
-                projects = result['raw_result']['projects']
-            elif 'projects' in result:
-                print("Found direct 'projects' structure")
-                projects = result['projects']
-            
-            print(f"Extracted {len(projects)} projects from dictionary")
-        
-        # Generate today's date in MM/DD/YYYY format - use this for ALL projects
-        today_date = datetime.now().strftime("%m/%d/%Y")
-        print(f"Using today's date for all projects: {today_date}")
-        
-        # Standardize each project
-        print("\n🔄 Standardizing individual projects")
-        for project in projects:
-            print(f"\nProcessing project: {project.get('ProjectName') or project.get('name', 'Unknown')}")
-            
-            # Handle key points with more flexibility
-            key_points = []
-            if "KeyPoints" in project and isinstance(project["KeyPoints"], list):
-                key_points = project["KeyPoints"]
-            elif "keyPoints" in project and isinstance(project["keyPoints"], list):
-                key_points = project["keyPoints"]
-            elif "key_points" in project and isinstance(project["key_points"], list):
-                key_points = project["key_points"]
-            
-            # Handle partners with similar flexibility
-            partners = []
-            if "partners" in project and isinstance(project["partners"], list):
-                partners = project["partners"]
-            elif "Partners" in project and isinstance(project["Partners"], list):
-                partners = project["Partners"]
-            
-            standardized_project = {
-                "name": project.get("ProjectName") or project.get("name", "Unknown"),
-                "location": project.get("Location") or project.get("location", country),
-                "capacity": str(project.get("Capacity_MW") or project.get("capacity", "N/A")),
-                "developer": project.get("Developer") or project.get("developer", "Unknown"),
-                "investment": project.get("InvestmentValue") or project.get("investment", "N/A"),
-                "timeline": project.get("Timeline") or project.get("timeline", "N/A"),
-                "status": project.get("CurrentStatus") or project.get("status", "N/A"),
-                "source_url": project.get("source_url", ""),
-                "source_name": project.get("source_name", country),
-                "category": project.get("category", "development"),
-                "date": today_date,  # Always use today's date
-                "keyPoints": key_points,
-                "partners": partners
-            }
-            standardized_projects.append(standardized_project)
-
-        print(f"\n✅ Successfully standardized {len(standardized_projects)} projects")
+        standardized_projects = normalize_projects(extract_projects(result), country)
+        logger.debug("✅ Standardized %d projects for %s", len(standardized_projects), country)
         
         # Extract promising projects from the original result if available
         most_promising_projects = []
         if isinstance(result, dict) and "Summary" in result and "Most promising projects" in result["Summary"]:
             most_promising_projects = result["Summary"]["Most promising projects"]
-            print(f"Found {len(most_promising_projects)} promising projects in original result")
         
         # Create final result structure
         standardized_result = {
@@ -314,68 +409,369 @@ def standardize_country_result(result: any, country: str) -> Dict:
         return standardized_result
 
     except Exception as e:
-        print(f"\n❌ Error in standardize_country_result for {country}")
-        print(f"Error type: {type(e).__name__}")
-        print(f"Error message: {str(e)}")
-        print("Full traceback:")
-        import traceback
-        traceback.print_exc()
-        return create_empty_result()
+        logger.exception("❌ Error in standardize_country_result for %s", country)
+        return {"error": str(e)}
 
 @app.get("/api/progress")
-async def get_progress():
+async def get_progress(job_id: Optional[str] = None):
+    """Progress events for one job, or for every job when no job_id is given"""
     async def event_generator():
-        while True:
-            if progress_updates:
-                update = progress_updates.pop(0)
-                yield {
-                    "event": "message",
-                    "data": json.dumps(update)
-                }
-            await asyncio.sleep(0.1)
+        async for update in progress_broker.subscribe(job_id):
+            yield {
+                "event": "message",
+                "data": json.dumps(update)
+            }
 
     return EventSourceResponse(event_generator())
 
+async def run_region_job(region: str, technology: str, incremental: bool = False) -> Dict:
+    """Run a region scan for the job set in current_job_id"""
+    # Background jobs yield the API rate limits to interactive scans
+    current_priority.set(BATCH)
+    try:
+        result = await process_region(region, technology, incremental)
+    except Exception:
+        await send_progress_update("all", "error")
+        raise
+    await send_progress_update("all", "complete")
+    return result
+
+# Background region scans submitted through /api/jobs
+job_manager = JobManager(job_store, run_region_job, progress_broker)
+
+def validate_scan_request(region: str) -> None:
+    """Check API keys and region before starting a scan"""
+    # Validate environment variables
+    if not os.getenv('SERPER_API_KEY'):
+        raise HTTPException(status_code=500, detail="SERPER_API_KEY not found")
+    if not os.getenv('OPENAI_API_KEY'):
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not found")
+    
+    logger.info("🌍 Processing region %s", region)
+    
+    if not get_countries_for_region(region):
+        raise HTTPException(status_code=400, detail=f"Invalid region: {region}")
+
+def start_scan(job_id: Optional[str], resume: bool = False,
+               technologies: Optional[List[str]] = None) -> str:
+    """Job ID for a synchronous scan, checked against the scans that used it before.
+
+    Without a job_id the server issues a new one. A client-chosen ID must
+    be new: its directory, and those of a batch's per-technology runs, are
+    claimed so no two scans share checkpoints, artifacts or a latest run.
+    Only resume=true continues an earlier scan from its checkpoints, and
+    only one that is neither running nor finished.
+    """
+    if job_id is None:
+        if resume:
+            raise HTTPException(status_code=400, detail="resume needs the job_id of the scan to continue")
+        job_id = new_job_id()
+        running_scans.add(job_id)
+        return job_id
+    store = get_result_store()
+    run_ids = [f"{job_id}-{technology_slug(t)}" for t in technologies] if technologies else [job_id]
+    try:
+        if job_store.get(job_id) is not None:
+            raise HTTPException(status_code=409,
+                                detail=f"Job {job_id} is a background job; resume it with /api/jobs/{job_id}/resume")
+        if resume:
+            if job_id in running_scans:
+                raise HTTPException(status_code=409, detail=f"Job {job_id} is still running")
+            if not store.job_dir(job_id).is_dir():
+                raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+            if all("accumulated_analysis" in store.list(run_id) for run_id in run_ids):
+                raise HTTPException(status_code=409, detail=f"Job {job_id} has already finished")
+        elif not all([store.claim(run_id) for run_id in {job_id, *run_ids}]):
+            raise HTTPException(status_code=409,
+                                detail=f"Job ID {job_id} is already in use; pick a new one or omit it")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    running_scans.add(job_id)
+    return job_id
+
+def finish_scan(job_id: str) -> None:
+    running_scans.discard(job_id)
+    progress_broker.finish(job_id)
+
 @app.get("/api/projects")
-async def get_projects(region: str, technology: str):
+async def get_projects(region: str, technology: str, incremental: bool = False,
+                       job_id: Optional[str] = None, resume: bool = False):
+    # Clients may pick the job ID up front so they can subscribe to /api/progress first
+    job_id = start_scan(job_id, resume)
+    current_job_id.set(job_id)
     try:
         load_dotenv()
-        progress_updates.clear()
 
-        # Validate environment variables
-        if not os.getenv('SERPER_API_KEY'):
-            raise HTTPException(status_code=500, detail="SERPER_API_KEY not found")
-        if not os.getenv('OPENAI_API_KEY'):
-            raise HTTPException(status_code=500, detail="OPENAI_API_KEY not found")
-        
-        print(f"\n🌍 Processing region {region}")
-        
-        if not get_countries_for_region(region):
-            raise HTTPException(status_code=400, detail=f"Invalid region: {region}")
+        validate_scan_request(region)
 
         # Process the region and get results
-        result = await process_region(region, technology)
+        result = await process_region(region, technology, incremental)
         
-        # The accumulator.save_results() already saved the files to the output directory
-        # No need to save them again here
-        output_dir = Path(__file__).parent.parent / 'output'
-        output_dir = output_dir.absolute()  # Get absolute path without resolving symlinks
-        output_file = output_dir / 'accumulated_analysis.json'
-        search_output_file = output_dir / 'search_results.json'
-        
-        print("\n💾 Results saved to:", output_file)
-        print("\n💾 Search results saved to:", search_output_file)
+        # The accumulator.save_results() already saved the files to the job's directory
+        logger.info("💾 Results saved to: %s", get_result_store().job_dir(job_id))
         await send_progress_update("all", "complete")
-        return result
+        result["job_id"] = job_id
+        return json_response(result)
 
     except Exception as e:
-        print(f"\n❌ Error in get_projects: {str(e)}")
+        logger.error("❌ Error in get_projects: %s", e)
         await send_progress_update("all", "error")
-        return {"error": str(e)}
+        return {"error": str(e), "job_id": job_id}
+    finally:
+        finish_scan(job_id)
+
+@app.get("/api/projects/batch")
+async def get_projects_batch(region: str, technologies: str, incremental: bool = False,
+                             job_id: Optional[str] = None, resume: bool = False):
+    """Scan a region for several comma-separated technologies; results are keyed by technology"""
+    technology_list = parse_technologies(technologies)
+    if not technology_list:
+        raise HTTPException(status_code=400, detail="No technologies given")
+    job_id = start_scan(job_id, resume, technology_list)
+    current_job_id.set(job_id)
+    try:
+        load_dotenv()
+
+        validate_scan_request(region)
+
+        result = await process_region_batch(region, technology_list, incremental)
+        await send_progress_update("all", "complete")
+        result["job_id"] = job_id
+        return json_response(result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("❌ Error in get_projects_batch: %s", e)
+        await send_progress_update("all", "error")
+        return {"error": str(e), "job_id": job_id}
+    finally:
+        finish_scan(job_id)
+
+@app.get("/api/projects/stream")
+async def stream_projects(region: str, technology: str, incremental: bool = False,
+                          job_id: Optional[str] = None, resume: bool = False):
+    """Stream each country's projects as NDJSON as soon as the country finishes.
+
+    One {"event": "country", ...} line is sent per country, followed by a
+    final {"event": "summary", ...} line once the whole region is done.
+    """
+    load_dotenv()
+    validate_scan_request(region)
+
+    job_id = start_scan(job_id, resume)
+
+    async def ndjson_lines():
+        # The body is iterated in a different task than the endpoint, so set the job here
+        current_job_id.set(job_id)
+        accumulator = create_accumulator(job_id, len(get_countries_for_region(region)))
+        try:
+            async for country, result in iter_region_results(region, technology, accumulator, incremental):
+                analysis = result.get("analysis", {})
+                event = {
+                    "event": "country",
+                    "country": country,
+                    "projects": analysis.get("Detailed Project List", []),
+                    "summary": analysis.get("Summary", {}),
+                    "search_results": result.get("search_results", [])
+                }
+                if "error" in result:
+                    event["error"] = result["error"]
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+            await store_region_results(accumulator, region, technology)
+            await send_progress_update("all", "complete")
+            yield json.dumps({
+                "event": "summary",
+                "job_id": job_id,
+                "timestamp": datetime.now().isoformat(),
+                "summary": build_region_summary(accumulator)
+            }, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error("❌ Error in stream_projects: %s", e)
+            await send_progress_update("all", "error")
+            yield json.dumps({"event": "error", "job_id": job_id, "error": str(e)}) + "\n"
+        finally:
+            finish_scan(job_id)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson",
+                             headers={"X-Job-Id": job_id})
+
+class JobRequest(BaseModel):
+    region: str
+    technology: str
+    incremental: bool = False
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """Queue a region scan and return its job ID immediately"""
+    load_dotenv()
+    validate_scan_request(request.region)
+    job_id, coalesced = job_manager.submit(
+        request.region, request.technology, incremental=request.incremental
+    )
+    return {"job_id": job_id, "coalesced": coalesced, **job_manager.store.get(job_id)}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.post("/api/jobs/{job_id}/resume", status_code=202)
+async def resume_job(job_id: str):
+    """Run a failed job again, skipping the countries and stages it already finished"""
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job["status"] != FAILED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}, not failed")
+    load_dotenv()
+    validate_scan_request(job["region"])
+    resumed_id, coalesced = job_manager.resume(job_id)
+    return {"job_id": resumed_id, "coalesced": coalesced, **job_manager.store.get(resumed_id)}
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job["status"] == FAILED:
+        return {"error": job["error"], "job_id": job_id}
+    if job["status"] != COMPLETED:
+        # Not finished yet: report the status with 202 so clients keep polling
+        return JSONResponse(status_code=202, content=job)
+    path = job_manager.store.result_path(job_id)
+    if path is None:
+        # Stored before results were kept as files
+        return job_manager.store.get_result(job_id)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"The result of job {job_id} is no longer stored")
+    # Sent from the file as written, without parsing it
+    return FileResponse(path, media_type="application/json")
+
+@app.get("/api/jobs/{job_id}/artifacts")
+async def list_job_artifacts(job_id: str):
+    try:
+        return {"job_id": job_id, "artifacts": get_result_store().list(job_id)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/jobs/{job_id}/artifacts/{name}")
+async def get_job_artifact(job_id: str, name: str, pretty: bool = False):
+    """One stored artifact of a job; pretty=true returns it indented"""
+    try:
+        data = get_result_store().read(job_id, name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Unknown artifact: {name}")
+    if pretty:
+        return Response(json.dumps(data, ensure_ascii=False, indent=2), media_type="application/json")
+    return data
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    return if_none_match is not None and (
+        if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+    )
+
+@app.get("/api/results/projects")
+async def query_results(region: str, technology: str, country: Optional[str] = None,
+                        developer: Optional[str] = None, status: Optional[str] = None,
+                        category: Optional[str] = None, min_capacity_mw: Optional[float] = None,
+                        sort: str = "name", order: str = "asc", limit: int = 50,
+                        cursor: Optional[str] = None,
+                        if_none_match: Optional[str] = Header(None)):
+    """Projects from the latest finished scan of a region, without running any crew"""
+    filters = {
+        "country": country, "developer": developer, "status": status,
+        "category": category, "min_capacity_mw": min_capacity_mw,
+    }
+    filters = {key: value for key, value in filters.items() if value is not None}
+    try:
+        page = results_query.projects(region, technology, filters, sort, order == "desc",
+                                      max(1, min(limit, 500)), cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail=f"No finished scan for {region} / {technology}")
+
+    etag = page.pop("etag")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=page, headers=headers)
+
+@app.get("/api/results/summary")
+async def query_results_summary(region: str, technology: str,
+                                if_none_match: Optional[str] = Header(None)):
+    """Summary of the latest finished scan of a region"""
+    snapshot = results_query.latest(region, technology)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No finished scan for {region} / {technology}")
+    etag = f'W/"{snapshot.job_id}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content={"job_id": snapshot.job_id, "timestamp": snapshot.timestamp,
+                                 "summary": snapshot.summary}, headers=headers)
+
+@app.get("/api/regions")
+async def list_regions():
+    """Regions that can be scanned, each with its countries in the order they are started"""
+    return {"regions": get_region_registry().describe()}
+
+@app.get("/api/history/projects")
+async def query_project_history(q: Optional[str] = None, country: Optional[str] = None,
+                                technology: Optional[str] = None, status: Optional[str] = None,
+                                category: Optional[str] = None, limit: int = 50, offset: int = 0):
+    """Projects from all previous scans, deduplicated, most recently seen first"""
+    limit = max(1, min(limit, 500))
+    projects = await asyncio.to_thread(
+        get_project_index().query, q, country, technology, status, category, limit, max(0, offset)
+    )
+    return {"projects": projects, "count": len(projects)}
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "crew_pool": crew_pool.stats(),
+        "progress": progress_broker.stats(),
+        "jobs": job_manager.stats(),
+        "country_singleflight": country_flight.stats(),
+        "search_cache": get_cached_search().cache.stats(),
+        "scrape_cache": get_scrape_cache().stats(),
+        "llm_cache": get_llm_cache().cache.stats(),
+        "preprocessing": get_preprocess_totals().stats(),
+        "rate_limits": rate_limiter_stats(),
+        "project_index": get_project_index().stats()
+    }
+
+@app.delete("/api/cache/llm")
+async def clear_llm_cache():
+    """Invalidate all memoized analyst responses"""
+    get_llm_cache().clear()
+    return {"status": "cleared"}
+
+@app.on_event("startup")
+async def recover_interrupted_jobs():
+    if RESUME_INTERRUPTED_JOBS:
+        # Each job continues from its country checkpoints
+        for job_id in job_manager.store.interrupted():
+            resumed_id, _ = job_manager.resume(job_id)
+            if resumed_id != job_id:
+                # An older job for the same region and technology is already resuming
+                job_manager.store.fail(job_id, "Interrupted by server restart")
+        return
+    interrupted = job_manager.store.mark_interrupted()
+    if interrupted:
+        logger.warning("⚠️ Marked %d jobs interrupted by the last shutdown as failed", interrupted)
+
+@app.on_event("shutdown")
+async def shutdown_crew_pool():
+    crew_pool.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,163 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Canonical project fields (as sent to the frontend) and the field names the
+# analyst may use for them, in order of preference
+FIELD_ALIASES = {
+    "name": ("ProjectName", "name"),
+    "location": ("Location", "location"),
+    "capacity": ("Capacity_MW", "capacity"),
+    "developer": ("Developer", "developer"),
+    "investment": ("InvestmentValue", "investment"),
+    "timeline": ("Timeline", "timeline"),
+    "status": ("CurrentStatus", "status"),
+    "source_url": ("source_url",),
+    "source_name": ("source_name",),
+    "category": ("category",),
+    "keyPoints": ("KeyPoints", "keyPoints", "key_points"),
+    "partners": ("partners", "Partners"),
+}
+
+LIST_FIELDS = frozenset({"keyPoints", "partners"})
+
+# Fallback for fields the analyst left out; None means "the country being processed"
+FIELD_DEFAULTS = {
+    "name": "Unknown",
+    "location": None,
+    "capacity": "N/A",
+    "developer": "Unknown",
+    "investment": "N/A",
+    "timeline": "N/A",
+    "status": "N/A",
+    "source_url": "",
+    "source_name": None,
+    "category": "development",
+}
+
+# The tables above as (field, aliases, default) and (field, aliases) tuples, in output order
+_SCALAR_FIELDS = tuple((field, aliases, FIELD_DEFAULTS[field])
+                       for field, aliases in FIELD_ALIASES.items() if field not in LIST_FIELDS)
+_LIST_FIELDS = tuple((field, aliases) for field, aliases in FIELD_ALIASES.items() if field in LIST_FIELDS)
+
+# Keys of a project that has already been normalized
+CANONICAL_KEYS = frozenset(FIELD_ALIASES) | {"date", "capacity_mw"}
+
+# A number followed by a unit; values with no unit anywhere fall back to their first number.
+# Thousands may be grouped with spaces (including no-break spaces), as in "1 000 MW".
+_NUMBER_PATTERN = r"\d{1,3}(?:[ \u00a0\u202f]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)*"
+_CAPACITY_WITH_UNIT = re.compile(rf"({_NUMBER_PATTERN})\s*(gw|mw|kw)", re.IGNORECASE)
+_NUMBER = re.compile(_NUMBER_PATTERN)
+_THOUSANDS_SPACE = re.compile(r"[ \u00a0\u202f]")
+_UNIT_TO_MW = {"gw": 1000.0, "mw": 1.0, "kw": 0.001}
+
+
+def parse_capacity_mw(value: Any) -> Optional[float]:
+    """Capacity in MW from a number or text such as "1.2 GW", "75 MWp" or "1,500 MW".
+
+    The first number next to a unit is used, so "Phase 2: 100 MW" is 100 MW
+    and a range such as "100-200 MW" gives 200. Values without any unit use
+    their first number, taken to be MW (the prompt asks for Capacity_MW).
+    Storage capacities in MWh/GWh are converted with the same factors.
+    A capacity of zero is not a capacity, so it gives None like unparsable text.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value else None
+    text = str(value)
+    match = _CAPACITY_WITH_UNIT.search(text)
+    if match:
+        number, unit = match.groups()
+    else:
+        match = _NUMBER.search(text)
+        if not match:
+            return None
+        number, unit = match.group(0), None
+    number = _THOUSANDS_SPACE.sub("", number)
+    if "," in number:
+        if "." not in number and len(number.rsplit(",", 1)[1]) != 3:
+            # Decimal comma, e.g. "2,5 MW"
+            number = number.replace(",", ".")
+        else:
+            number = number.replace(",", "")
+    try:
+        amount = float(number)
+    except ValueError:
+        return None
+    if not amount:
+        return None
+    return amount * _UNIT_TO_MW[unit.lower()] if unit else amount
+
+
+def _first(project: Dict[str, Any], aliases: Tuple[str, ...]) -> Any:
+    """The value of the first non-empty alias, or None"""
+    for alias in aliases:
+        value = project.get(alias)
+        if value:
+            return value
+    return None
+
+
+def _first_list(project: Dict[str, Any], aliases: Tuple[str, ...]) -> List[Any]:
+    """The first alias holding a real list; anything else falls through to the next one"""
+    for alias in aliases:
+        value = project.get(alias)
+        if isinstance(value, list):
+            return value
+    return []
+
+
+def normalize_project(project: Dict[str, Any], country: str, date: str) -> Dict[str, Any]:
+    """Map a raw analyst project onto the canonical fields in a single pass.
+
+    For each field the first non-empty alias from FIELD_ALIASES wins; fields
+    the analyst left out get their FIELD_DEFAULTS value, with the country
+    standing in for a missing location or source name.
+    """
+    normalized: Dict[str, Any] = {}
+    for field, aliases, default in _SCALAR_FIELDS:
+        value = _first(project, aliases) or (country if default is None else default)
+        if field == "capacity":
+            normalized["capacity"] = str(value)
+            normalized["capacity_mw"] = parse_capacity_mw(value)
+        else:
+            normalized[field] = value
+    # Always use today's date for all projects
+    normalized["date"] = date
+    for field, aliases in _LIST_FIELDS:
+        normalized[field] = _first_list(project, aliases)
+    return normalized
+
+
+def today() -> str:
+    """Today's date in the MM/DD/YYYY format used for all projects"""
+    return datetime.now().strftime("%m/%d/%Y")
+
+
+def normalize_projects(projects: Iterable[Any], country: str) -> List[Dict[str, Any]]:
+    """Normalize a project list; projects that are already normalized are kept as they are"""
+    date = today()
+    normalized = []
+    for project in projects:
+        if not isinstance(project, dict):
+            continue
+        if project.keys() == CANONICAL_KEYS:
+            normalized.append(project)
+        else:
+            normalized.append(normalize_project(project, country, date))
+    return normalized
+
+
+def extract_projects(result: Any) -> List[Dict[str, Any]]:
+    """Find the project list in the structures the analyst is known to produce"""
+    if isinstance(result, list):
+        return [p for p in result if isinstance(p, dict) and ('ProjectName' in p or 'name' in p)]
+    if isinstance(result, dict):
+        if 'Detailed Project List' in result:
+            return result.get('Detailed Project List') or []
+        if 'raw_result' in result and 'projects' in result['raw_result']:
+            return result['raw_result']['projects']
+        if 'projects' in result:
+            return result['projects']
+    return []
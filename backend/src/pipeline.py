@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from src.cache.scrape import get_scrape_cache, normalize_url
+from src.cache.search import get_cached_search, organic_results
+from src.clients import get_analyst_llm
+from src.config.loader import render_config
+from src.config.settings import (
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_MAX_DOCUMENT_CHARS,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_SCRAPE_WORKERS,
+    PREPROCESS_ENABLED,
+)
+from src.extract import extract_json
+from src.preprocess import PagePreprocessor, record_run
+
+logger = logging.getLogger(__name__)
+
+# Searches run for every country; their results feed the scrapers as they arrive
+SEARCH_QUERIES = (
+    "{technology} energy projects {country}",
+    "new {technology} project {country} MW",
+    "{technology} {country} developer announces",
+)
+
+SUMMARY_KEY = "Summary"
+DEVELOPERS_KEY = "Major developers active in the market"
+PROMISING_KEY = "Most promising projects"
+PROJECTS_KEY = "Detailed Project List"
+
+# Marks the end of a queue for the stage reading it
+_DONE = object()
+
+BlockingRunner = Callable[..., Awaitable[Any]]
+
+
+class StageTimer:
+    """Items handled, busy time and wall-clock span of one pipeline stage"""
+
+    def __init__(self):
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def begin(self) -> float:
+        now = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = now
+        return now
+
+    def end(self, began: float, items: int = 1) -> None:
+        now = time.perf_counter()
+        self.items += items
+        self.busy_seconds += now - began
+        self.finished_at = now
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "started_after": round(self.started_at - origin, 3) if self.started_at else None,
+            "finished_after": round(self.finished_at - origin, 3) if self.finished_at else None,
+        }
+
+
+def merge_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the analyst's answers for several document batches into one analysis"""
+    developers: List[str] = []
+    promising: List[str] = []
+    projects: List[Dict[str, Any]] = []
+    seen_projects = set()
+    for analysis in analyses:
+        summary = analysis.get(SUMMARY_KEY) or {}
+        for developer in summary.get(DEVELOPERS_KEY) or []:
+            if developer not in developers:
+                developers.append(developer)
+        promising.extend(p for p in summary.get(PROMISING_KEY) or [] if p not in promising)
+        for project in analysis.get(PROJECTS_KEY) or []:
+            if not isinstance(project, dict):
+                continue
+            name = str(project.get("ProjectName") or project.get("name") or "").strip().lower()
+            if name and name in seen_projects:
+                continue
+            seen_projects.add(name)
+            projects.append(project)
+    return {SUMMARY_KEY: {DEVELOPERS_KEY: developers, PROMISING_KEY: promising}, PROJECTS_KEY: projects}
+
+
+class CountryPipeline:
+    """Search, scrape and analysis for one country as concurrent stages.
+
+    Search results are queued for a pool of scrapers as soon as each query
+    returns, and scraped pages are handed to the analyst in batches while
+    scraping continues. Queues between the stages are bounded, so a slow
+    stage holds the one before it back instead of buffering without limit.
+
+    Batches are fixed runs of consecutive sources, in the order the queries
+    were listed, rather than whichever pages arrived first, so a rerun over
+    the same sources sends the analyst the same prompts and hits the LLM cache.
+    """
+
+    def __init__(self, country: str, technology: str,
+                 seed_sources: Optional[List[Dict[str, str]]] = None,
+                 run_analysis: Optional[BlockingRunner] = None,
+                 scrape_workers: int = PIPELINE_SCRAPE_WORKERS,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 batch_size: int = PIPELINE_BATCH_SIZE,
+                 search_queries: Sequence[str] = SEARCH_QUERIES,
+                 on_searched: Optional[Callable[[List[Dict[str, str]]], None]] = None):
+        self.country = country
+        self.technology = technology
+        self.seed_sources = seed_sources or []
+        # No queries when resuming with the sources of an earlier run as seeds
+        self.search_queries = search_queries
+        # Called with every source found once the search stage is done, e.g. to checkpoint them
+        self.on_searched = on_searched
+        # Analyst calls go through the crew worker pool in the app so they share its limits
+        self.run_analysis = run_analysis or asyncio.to_thread
+        self.scrape_workers = scrape_workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.timers = {"search": StageTimer(), "scrape": StageTimer(), "analyze": StageTimer()}
+        self.preprocessor = PagePreprocessor(country, technology) if PREPROCESS_ENABLED else None
+        self.sources: List[Dict[str, str]] = []
+        # Failed searches, pages scraped, analyst calls made and how many gave a usable analysis
+        self.searches_failed = 0
+        self.pages_scraped = 0
+        self.batches = 0
+        self.batches_analyzed = 0
+        self.timings: Dict[str, Any] = {}
+        self._seen_urls = set()
+
+    async def run(self) -> Dict[str, Any]:
+        """Run all stages and return the merged analysis.
+
+        Returns {"error": ...} instead when every search, every scrape or
+        every analyst call failed, so a failure is never mistaken for a
+        country without projects. Finding no sources, or only pages with
+        nothing left after preprocessing, is an empty analysis.
+        """
+        origin = time.perf_counter()
+        urls: asyncio.Queue = asyncio.Queue(self.queue_size)
+        documents: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        scrapers = [asyncio.ensure_future(self._scrape(urls, documents))
+                    for _ in range(self.scrape_workers)]
+
+        async def search():
+            await self._search(urls)
+            for _ in scrapers:
+                await urls.put(_DONE)
+
+        async def scrape():
+            await asyncio.gather(*scrapers)
+            await documents.put(_DONE)
+
+        analyzer = asyncio.ensure_future(self._analyze(documents))
+        stages = [asyncio.ensure_future(search()), asyncio.ensure_future(scrape()), analyzer]
+        try:
+            # A failed stage stops waiting at once: the stages around it would block on its queue
+            done, _ = await asyncio.wait(stages, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+            analyses = analyzer.result()
+        finally:
+            for task in scrapers + stages:
+                task.cancel()
+
+        self.timings = {name: timer.to_dict(origin) for name, timer in self.timers.items()}
+        self.timings["total_seconds"] = round(time.perf_counter() - origin, 3)
+        logger.info("⏱️ Pipeline for %s (%s): %s", self.country, self.technology, self.timings)
+        record_run(self.country, self.technology, self.preprocessor)
+        if not self.sources:
+            if self.search_queries and self.searches_failed == len(self.search_queries):
+                return {"error": f"All {self.searches_failed} searches failed"}
+            logger.info("🔍 No sources found for %s", self.country)
+        elif not self.pages_scraped:
+            return {"error": f"None of the {len(self.sources)} sources could be scraped"}
+        elif not self.batches:
+            logger.warning("⚠️ All %d pages scraped for %s were empty after preprocessing",
+                           self.pages_scraped, self.country)
+        elif not analyses:
+            return {"error": f"All {self.batches} analysis batches failed"}
+        if self.batches_analyzed < self.batches:
+            logger.warning("⚠️ %d of %d analysis batches failed for %s",
+                           self.batches - self.batches_analyzed, self.batches, self.country)
+        return merge_analyses(analyses)
+
+    async def _enqueue(self, urls: asyncio.Queue, source: Dict[str, str]) -> None:
+        key = normalize_url(source["url"])
+        if key in self._seen_urls:
+            return
+        self._seen_urls.add(key)
+        self.sources.append(source)
+        # Blocks while the scrapers are behind
+        await urls.put((len(self.sources) - 1, source))
+
+    async def _search(self, urls: asyncio.Queue) -> None:
+        for source in self.seed_sources:
+            if source.get("url"):
+                await self._enqueue(urls, source)
+
+        search = get_cached_search()
+        pending = [
+            asyncio.ensure_future(asyncio.to_thread(
+                search.search, query.format(technology=self.technology, country=self.country),
+                self.country, self.technology))
+            for query in self.search_queries
+        ]
+        timer = self.timers["search"]
+        began = timer.begin()
+        # Searches run concurrently, but their results are queued in query order
+        for next_result in pending:
+            try:
+                response = await next_result
+            except Exception as e:
+                logger.warning("⚠️ Search failed for %s: %s", self.country, e)
+                self.searches_failed += 1
+                continue
+            timer.end(began)
+            began = timer.begin()
+            for source in organic_results(response):
+                await self._enqueue(urls, source)
+        if self.on_searched is not None:
+            self.on_searched(list(self.sources))
+
+    async def _scrape(self, urls: asyncio.Queue, documents: asyncio.Queue) -> None:
+        scrape_cache = get_scrape_cache()
+        timer = self.timers["scrape"]
+        while True:
+            item = await urls.get()
+            if item is _DONE:
+                return
+            index, source = item
+            began = timer.begin()
+            try:
+                text = await asyncio.to_thread(scrape_cache.fetch_text, source["url"])
+            except Exception as e:
+                logger.debug("Scrape of %s failed: %s", source["url"], e)
+                text = None
+            finally:
+                timer.end(began)
+            # Failed pages are reported too, so the analyst knows their batch is complete
+            await documents.put((index, {**source, "text": text} if text else None))
+
+    def _prepare(self, document: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """The page as the analyst gets it, or None if nothing is left of it"""
+        if document is None:
+            return None
+        if self.preprocessor is not None:
+            # The preprocessor's budget and seen passages depend on page order, so pages go through it in source order
+            text = self.preprocessor.prepare(document["text"])
+        else:
+            text = document["text"][:PIPELINE_MAX_DOCUMENT_CHARS]
+        return {**document, "text": text} if text and text.strip() else None
+
+    async def _analyze(self, documents: asyncio.Queue) -> List[Dict[str, Any]]:
+        analyses = []
+        # Scraped pages by source index, until their batch is analyzed; None for failed pages
+        scraped: Dict[int, Optional[Dict[str, str]]] = {}
+        next_batch = 0
+        done = False
+        while not done:
+            item = await documents.get()
+            if item is _DONE:
+                done = True
+            else:
+                index, document = item
+                scraped[index] = document
+                if document is not None:
+                    self.pages_scraped += 1
+            # A batch starts once all of its sources are scraped; at the end, the last one may be short
+            while True:
+                start = next_batch * self.batch_size
+                end = min(start + self.batch_size, len(self.sources)) if done else start + self.batch_size
+                if start >= end or any(i not in scraped for i in range(start, end)):
+                    break
+                next_batch += 1
+                batch = [document for document in (self._prepare(scraped.pop(i)) for i in range(start, end))
+                         if document is not None]
+                if batch:
+                    self.batches += 1
+                    analysis = await self._analyze_batch(batch)
+                    if analysis is not None:
+                        self.batches_analyzed += 1
+                        analyses.append(analysis)
+        return analyses
+
+    def build_prompt(self, batch: List[Dict[str, str]]) -> str:
+        task = render_config(self.country, self.technology)[1]['analysis_task']
+        pages = "\n\n".join(
+            f"Source: {document.get('title', '')}\nURL: {document['url']}\n{document['text']}"
+            for document in batch
+        )
+        return (f"{task['description']}\n\nExpected output: {task['expected_output']}\n\n"
+                f"Scraped pages:\n\n{pages}")
+
+    async def _analyze_batch(self, batch: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        timer = self.timers["analyze"]
+        began = timer.begin()
+        try:
+            response = await self.run_analysis(get_analyst_llm().call, self.build_prompt(batch))
+        except Exception as e:
+            logger.error("❌ Analysis of %d pages for %s failed: %s", len(batch), self.country, e)
+            return None
+        finally:
+            timer.end(began, len(batch))
+        extraction = extract_json(response, accept=lambda value: isinstance(value, dict))
+        if not extraction.ok:
+            logger.warning("⚠️ Could not parse analysis batch for %s: %s", self.country, extraction.error)
+            return None
+        return extraction.value
@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.config.settings import PREPROCESS_PAGE_TOKENS, PREPROCESS_TOKEN_BUDGET
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # optional: token counts fall back to a character estimate
+    tiktoken = None
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, tiktoken
+    with _encoding_lock:
+        if _encoding is None and tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # The encoding file couldn't be downloaded; don't try again
+                tiktoken = None
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Prompt tokens of a text for the analyst model"""
+    encoding = _get_encoding()
+    if encoding is None:
+        # About four characters per token for English text
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# Lines made of these are site chrome, not article content
+BOILERPLATE_PATTERN = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|all rights reserved|subscribe|newsletter|"
+    r"sign in|log in|sign up|share this|follow us|read more|related articles|advertisement|"
+    r"skip to (main )?content|javascript",
+    re.IGNORECASE,
+)
+_CAPACITY_MENTION = re.compile(r"\d[\d.,]*\s*(gw|mw|kw)h?p?\b", re.IGNORECASE)
+_MONEY_MENTION = re.compile(r"(€|\$|£|eur|usd|million|billion|bn)\b", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"[.!?:;]\s*$")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Words that make a passage about a project rather than, say, company history
+PROJECT_WORDS = frozenset({
+    "project", "projects", "plant", "farm", "park", "capacity", "developer", "construction",
+    "commissioning", "commissioned", "permit", "permitting", "auction", "tender", "investment",
+    "financing", "grid", "connection", "operational", "planned", "approved", "announced",
+})
+
+
+def split_passages(text: str) -> List[str]:
+    """Main-content passages of scraped page text.
+
+    Navigation items, button labels and other short fragments without a
+    sentence ending or a number are dropped, as are lines that look like
+    cookie banners, sign-up prompts and footers.
+    """
+    passages = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        words = len(_WORD.findall(line))
+        if words < 6 and not _CAPACITY_MENTION.search(line):
+            continue
+        if words < 12 and not _SENTENCE_END.search(line) and not any(c.isdigit() for c in line):
+            continue
+        if words < 25 and BOILERPLATE_PATTERN.search(line):
+            continue
+        passages.append(line)
+    return passages
+
+
+class PagePreprocessor:
+    """Trims scraped pages for one country and technology to what the analyst needs.
+
+    Passages seen on an earlier page (shared headers, syndicated copies of
+    the same article) are dropped, the rest are ranked by relevance to the
+    country and technology, and the best ones are kept within a per-page
+    and a per-country token budget. Thread-safe, since crew tools may run
+    on several threads.
+    """
+
+    def __init__(self, country: str, technology: str,
+                 token_budget: int = PREPROCESS_TOKEN_BUDGET,
+                 page_tokens: int = PREPROCESS_PAGE_TOKENS):
+        self.country = country
+        self.technology = technology
+        self.token_budget = token_budget
+        self.page_tokens = page_tokens
+        self._country_words = {w.lower() for w in _WORD.findall(country)}
+        self._technology_words = {w.lower() for w in _WORD.findall(technology)}
+        self._seen_passages = set()
+        self._lock = threading.Lock()
+        self.stats = {"pages": 0, "tokens_in": 0, "tokens_out": 0, "duplicate_passages": 0}
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.stats["tokens_in"] - self.stats["tokens_out"]
+
+    @property
+    def remaining_tokens(self) -> int:
+        return max(0, self.token_budget - self.stats["tokens_out"])
+
+    def score(self, passage: str) -> float:
+        words = {w.lower() for w in _WORD.findall(passage)}
+        score = 0.0
+        if words & self._country_words:
+            score += 2
+        if words & self._technology_words:
+            score += 2
+        score += min(len(words & PROJECT_WORDS), 4) * 0.5
+        if _CAPACITY_MENTION.search(passage):
+            score += 2
+        if _MONEY_MENTION.search(passage):
+            score += 1
+        return score
+
+    def prepare(self, text: str) -> str:
+        """The relevant, not yet seen passages of a page, in page order, within budget"""
+        tokens_in = count_tokens(text)
+        candidates: List[Tuple[float, int, str, int]] = []
+        duplicates = 0
+        with self._lock:
+            for position, passage in enumerate(split_passages(text)):
+                digest = hashlib.sha1(passage.lower().encode("utf-8")).digest()
+                if digest in self._seen_passages:
+                    duplicates += 1
+                    continue
+                self._seen_passages.add(digest)
+                candidates.append((self.score(passage), position, passage, count_tokens(passage)))
+            budget = min(self.page_tokens, self.remaining_tokens)
+
+            # Best passages first until the budget is spent, then back into page order;
+            # passages that mention nothing relevant are never kept
+            candidates.sort(key=lambda c: (-c[0], c[1]))
+            kept, used = [], 0
+            for score, position, passage, tokens in candidates:
+                if score <= 0:
+                    break
+                if used + tokens > budget:
+                    continue
+                kept.append((position, passage))
+                used += tokens
+            kept.sort()
+
+            self.stats["pages"] += 1
+            self.stats["tokens_in"] += tokens_in
+            self.stats["tokens_out"] += used
+            self.stats["duplicate_passages"] += duplicates
+        return "\n".join(passage for _, passage in kept)
+
+    def report(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "tokens_saved": self.tokens_saved}
+
+
+class PreprocessTotals:
+    """Token savings of all preprocessed runs since the process started"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {"runs": 0, "pages": 0, "tokens_in": 0, "tokens_out": 0,
+                        "tokens_saved": 0, "duplicate_passages": 0}
+
+    def add(self, report: Dict[str, int]) -> None:
+        with self._lock:
+            self._totals["runs"] += 1
+            for key, value in report.items():
+                self._totals[key] += value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._totals)
+
+
+_shared_totals: Optional[PreprocessTotals] = None
+_shared_totals_lock = threading.Lock()
+
+
+def get_preprocess_totals() -> PreprocessTotals:
+    """Process-wide preprocessing counters, created on first use"""
+    global _shared_totals
+    with _shared_totals_lock:
+        if _shared_totals is None:
+            _shared_totals = PreprocessTotals()
+        return _shared_totals
+
+
+def record_run(country: str, technology: str, preprocessor: Optional[PagePreprocessor]) -> None:
+    """Log the tokens a run's preprocessing saved and add them to the process totals"""
+    if preprocessor is None or not preprocessor.stats["pages"]:
+        return
+    report = preprocessor.report()
+    get_preprocess_totals().add(report)
+    logger.info("✂️ Preprocessing for %s (%s): %d pages, %d of %d tokens kept, %d saved",
+                country, technology, report["pages"], report["tokens_out"],
+                report["tokens_in"], report["tokens_saved"])
@@ -0,0 +1,84 @@
+import asyncio
+import uuid
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Optional, Set
+
+from src.config.settings import PROGRESS_BUFFER_SIZE
+
+# Job the current task is working for; asyncio tasks inherit it from their creator
+current_job_id: ContextVar[Optional[str]] = ContextVar("current_job_id", default=None)
+
+# Put on a subscriber queue when its job finishes
+_END_OF_JOB = None
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+class ProgressBroker:
+    """In-process progress channels, one per job.
+
+    Every subscriber gets its own bounded queue and is only woken when an
+    event arrives. When a queue is full the oldest event is dropped, so a
+    slow client can never block a scan. Subscribing without a job ID
+    receives the events of all jobs.
+    """
+
+    def __init__(self, buffer_size: int = PROGRESS_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[Optional[str], Set[asyncio.Queue]] = defaultdict(set)
+        # Recent events per running job, replayed to clients that connect late
+        self._history: Dict[str, Deque[Dict]] = {}
+        # Recently finished jobs, so a subscriber that arrives too late returns at once
+        self._finished: Deque[str] = deque(maxlen=1000)
+
+    def _offer(self, queue: asyncio.Queue, event: Optional[Dict]) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    def publish(self, job_id: str, event: Dict) -> None:
+        history = self._history.setdefault(job_id, deque(maxlen=self.buffer_size))
+        history.append(event)
+        for queue in self._subscribers.get(job_id, ()):
+            self._offer(queue, event)
+        for queue in self._subscribers.get(None, ()):
+            self._offer(queue, event)
+
+    def finish(self, job_id: str) -> None:
+        """End the job's channel: subscribers drain their queues and stop"""
+        self._history.pop(job_id, None)
+        self._finished.append(job_id)
+        for queue in self._subscribers.pop(job_id, ()):
+            self._offer(queue, _END_OF_JOB)
+
+    async def subscribe(self, job_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Yield events for one job (or all jobs) until the job finishes or the client goes away"""
+        if job_id is not None and job_id in self._finished:
+            return
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.buffer_size)
+        if job_id is not None:
+            for event in self._history.get(job_id, ()):
+                self._offer(queue, event)
+        self._subscribers[job_id].add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _END_OF_JOB:
+                    return
+                yield event
+        finally:
+            # Runs on normal completion and when the SSE response is cancelled on disconnect
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active_jobs": len(self._history),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+        }
@@ -0,0 +1,400 @@
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import date
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from src.config.settings import PROJECT_INDEX_PATH
+
+# Words that say what kind of project it is rather than which one
+GENERIC_NAME_WORDS = frozenset({
+    "the", "and", "of", "de", "la", "le", "des", "der", "die", "das",
+    "project", "projects", "plant", "park", "farm", "station", "power", "energy",
+    "wind", "solar", "pv", "photovoltaic", "onshore", "offshore", "hybrid",
+    "battery", "storage", "bess", "hydro", "hydrogen", "phase", "stage", "mw", "gw",
+})
+
+UNKNOWN_VALUES = frozenset({"", "unknown", "n/a", "na", "none", "tbd"})
+
+# Two records are the same project at or above this score
+MATCH_THRESHOLD = 0.85
+
+# Blocks larger than this (a token shared by many names) are skipped unless nothing else matches
+MAX_BLOCK_SIZE = 200
+
+# Leading characters of a name word that also file it in a prefix block, so
+# spelling variants such as "Vis" and "Viss" are compared
+PREFIX_LENGTH = 3
+
+# Bumped when blocking_keys changes; older indexes get their blocks rebuilt on open
+BLOCKING_VERSION = 1
+
+# Most a name score can gain from matching developer, capacity and location
+MAX_BONUS = 0.25
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Numbers and roman numerals tell phases and units of the same site apart
+_ORDINAL = re.compile(r"^(?:\d+|i{1,3}|iv|v|vi{1,3}|ix|x)$")
+_FTS_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fold(text: Any) -> str:
+    """Lowercase ASCII words of a value, e.g. "Vindpark Østerild II" -> "vindpark osterild ii" """
+    if not isinstance(text, str):
+        return ""
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _NON_WORD.sub(" ", ascii_text.lower()).strip()
+
+
+def _known(value: Any) -> bool:
+    return isinstance(value, str) and value.strip().lower() not in UNKNOWN_VALUES
+
+
+def name_key(name: Any) -> str:
+    """Project name reduced to its distinctive words"""
+    return " ".join(word for word in _fold(name).split() if word not in GENERIC_NAME_WORDS)
+
+
+def _ordinals(words: Iterable[str]) -> Set[str]:
+    return {word for word in words if _ORDINAL.match(word)}
+
+
+def blocking_keys(technology: str, key: str) -> Set[str]:
+    """Keys under which a project is filed; only projects sharing a key are compared.
+
+    A key is a distinctive name word plus the name's numbers, since names
+    with different numbers never match anyway. Each word is also filed
+    under its first PREFIX_LENGTH characters, which catches single-word
+    spelling variants the whole-word keys would keep apart.
+    """
+    words = key.split()
+    numbers = "-".join(sorted(_ordinals(words)))
+    prefix = f"{technology.lower()}:"
+    distinctive = [word for word in words if len(word) >= 3 and not _ORDINAL.match(word)]
+    if not distinctive:
+        # Names like "Project 3": fall back to the whole reduced name
+        return {prefix + key} if key else set()
+    keys = {f"{prefix}{word}#{numbers}" for word in distinctive}
+    keys.update(f"{prefix}{word[:PREFIX_LENGTH]}*#{numbers}" for word in distinctive)
+    return keys
+
+
+def _capacity_close(a: Optional[float], b: Optional[float]) -> Optional[bool]:
+    if not a or not b:
+        return None
+    return abs(a - b) <= 0.1 * max(a, b)
+
+
+def match_score(new: Dict[str, Any], existing: Dict[str, Any]) -> float:
+    """How likely two index rows describe the same project (higher is more likely)"""
+    new_words, existing_words = set(new["name_key"].split()), set(existing["name_key"].split())
+    if _ordinals(new_words) != _ordinals(existing_words):
+        # "Phase 2" is not "Phase 3"
+        return 0.0
+    score = len(new_words & existing_words) / len(new_words | existing_words)
+    if score < 1.0:
+        # Character similarity catches spelling variants; quick_ratio() bounds ratio()
+        # from above, so the full comparison only runs when it could change the outcome
+        matcher = SequenceMatcher(None, new["name_key"], existing["name_key"])
+        upper_bound = matcher.quick_ratio()
+        if upper_bound > score and upper_bound + MAX_BONUS >= MATCH_THRESHOLD:
+            score = max(score, matcher.ratio())
+
+    if new["developer_key"] and existing["developer_key"]:
+        score += 0.1 if new["developer_key"] == existing["developer_key"] else -0.15
+    close = _capacity_close(new["capacity_mw"], existing["capacity_mw"])
+    if close is not None:
+        score += 0.1 if close else -0.2
+    if new["location_key"] and existing["location_key"]:
+        if set(new["location_key"].split()) & set(existing["location_key"].split()):
+            score += 0.05
+    if new["country"] != existing["country"]:
+        score -= 0.1
+    return score
+
+
+def _fts_query(text: str) -> str:
+    # Quote every word so user input can't use FTS syntax; prefix-match the words
+    return " ".join(f'"{token}"*' for token in _FTS_TOKEN.findall(text))
+
+
+class ProjectIndex:
+    """Persistent index of every project seen across runs, deduplicated across sources and countries.
+
+    New projects are only compared with projects that share a blocking key
+    (a distinctive word of the name within the same technology), so adding
+    a run costs roughly one block lookup per project instead of a scan of
+    the whole history.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS projects (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                name_key TEXT NOT NULL,
+                developer TEXT,
+                developer_key TEXT NOT NULL,
+                location_key TEXT NOT NULL,
+                country TEXT NOT NULL,
+                technology TEXT NOT NULL,
+                capacity_mw REAL,
+                status TEXT,
+                status_key TEXT NOT NULL,
+                category TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                seen_count INTEGER NOT NULL,
+                sources TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS projects_country ON projects (country, technology);
+            CREATE INDEX IF NOT EXISTS projects_technology ON projects (technology, last_seen);
+            CREATE INDEX IF NOT EXISTS projects_status ON projects (status_key);
+            CREATE INDEX IF NOT EXISTS projects_category ON projects (category);
+            CREATE TABLE IF NOT EXISTS project_blocks (
+                key TEXT NOT NULL,
+                project_id INTEGER NOT NULL,
+                PRIMARY KEY (key, project_id)
+            ) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts
+                USING fts5(name, developer, location, details);"""
+        )
+        self._rebuild_blocks()
+        self.added = 0
+        self.merged = 0
+        self.skipped = 0
+
+    def _rebuild_blocks(self) -> None:
+        """File every project under the current blocking keys if the index predates them.
+
+        Existing keys stay, including those registered for merged spellings.
+        """
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= BLOCKING_VERSION:
+            return
+        self._conn.execute("BEGIN")
+        try:
+            rows = self._conn.execute("SELECT id, technology, name_key FROM projects").fetchall()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO project_blocks (key, project_id) VALUES (?, ?)",
+                [(key, row["id"]) for row in rows for key in blocking_keys(row["technology"], row["name_key"])],
+            )
+            self._conn.execute(f"PRAGMA user_version = {BLOCKING_VERSION}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _candidates(self, keys: Set[str]) -> List[sqlite3.Row]:
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        sizes = dict(self._conn.execute(
+            f"SELECT key, COUNT(*) FROM project_blocks WHERE key IN ({placeholders}) GROUP BY key",
+            tuple(keys),
+        ).fetchall())
+        usable = [key for key in keys if 0 < sizes.get(key, 0) <= MAX_BLOCK_SIZE]
+        if not usable and sizes:
+            # Only oversized blocks: compare within the smallest one
+            usable = [min(sizes, key=sizes.get)]
+        if not usable:
+            return []
+        placeholders = ",".join("?" * len(usable))
+        return self._conn.execute(
+            f"SELECT id, name_key, developer_key, location_key, capacity_mw, country FROM projects "
+            f"WHERE id IN "
+            f"(SELECT project_id FROM project_blocks WHERE key IN ({placeholders}))",
+            tuple(usable),
+        ).fetchall()
+
+    def _index_text(self, project_id: int, project: Dict[str, Any]) -> None:
+        details = " ".join(str(point) for point in project.get("keyPoints") or [])
+        self._conn.execute("DELETE FROM projects_fts WHERE rowid = ?", (project_id,))
+        self._conn.execute(
+            "INSERT INTO projects_fts (rowid, name, developer, location, details) VALUES (?, ?, ?, ?, ?)",
+            (project_id, project.get("name") or "", project.get("developer") or "",
+             project.get("location") or "", details),
+        )
+
+    def _register_blocks(self, project_id: int, keys: Set[str]) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO project_blocks (key, project_id) VALUES (?, ?)",
+            [(key, project_id) for key in keys],
+        )
+
+    def _merge(self, project_id: int, project: Dict[str, Any], fields: Dict[str, Any],
+               keys: Set[str], seen: str) -> None:
+        row = self._conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
+        # Later sightings fill gaps and update what changes over time (status, capacity)
+        merged = json.loads(row["data"])
+        for field, value in project.items():
+            if value not in (None, "", [], "N/A", "Unknown") or field not in merged:
+                merged[field] = value
+        sources = json.loads(row["sources"])
+        if project.get("source_url") and project["source_url"] not in sources:
+            sources.append(project["source_url"])
+        self._conn.execute(
+            """UPDATE projects SET developer = ?, developer_key = ?, location_key = ?,
+                   capacity_mw = ?, status = ?, status_key = ?, category = ?,
+                   first_seen = MIN(first_seen, ?), last_seen = MAX(last_seen, ?),
+                   seen_count = seen_count + 1, sources = ?, data = ?
+               WHERE id = ?""",
+            (merged.get("developer"), fields["developer_key"] or row["developer_key"],
+             fields["location_key"] or row["location_key"],
+             fields["capacity_mw"] or row["capacity_mw"], merged.get("status"),
+             _fold(merged.get("status")), merged.get("category"), seen, seen,
+             json.dumps(sources, ensure_ascii=False), json.dumps(merged, ensure_ascii=False),
+             row["id"]),
+        )
+        # File the project under this spelling's keys too, so later sightings
+        # spelled the same way find it even if they share no key with the first name
+        self._register_blocks(row["id"], keys)
+        self._index_text(row["id"], merged)
+
+    def _insert(self, project: Dict[str, Any], fields: Dict[str, Any], keys: Set[str],
+                seen: str) -> None:
+        sources = [project["source_url"]] if project.get("source_url") else []
+        cursor = self._conn.execute(
+            """INSERT INTO projects (name, name_key, developer, developer_key, location_key,
+                   country, technology, capacity_mw, status, status_key, category,
+                   first_seen, last_seen, seen_count, sources, data)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)""",
+            (project.get("name"), fields["name_key"], project.get("developer"),
+             fields["developer_key"], fields["location_key"], fields["country"],
+             fields["technology"], fields["capacity_mw"], project.get("status"),
+             _fold(project.get("status")), project.get("category"), seen, seen,
+             json.dumps(sources, ensure_ascii=False), json.dumps(project, ensure_ascii=False)),
+        )
+        project_id = cursor.lastrowid
+        self._register_blocks(project_id, keys)
+        self._index_text(project_id, project)
+
+    def add_projects(self, projects_by_country: Union[Mapping[str, Iterable[Dict[str, Any]]],
+                                                      Iterable[Tuple[str, Iterable[Dict[str, Any]]]]],
+                     technology: str, seen_on: Optional[date] = None) -> Dict[str, int]:
+        """Add normalized projects (as in ResultsAccumulator's projects_by_country).
+
+        Takes the projects keyed by country, or (country, projects) pairs as
+        ResultsAccumulator.iter_projects_by_country yields them.
+
+        Returns how many projects were added, merged into an existing entry,
+        or skipped because they have no usable name.
+        """
+        seen = (seen_on or date.today()).isoformat()
+        counts = {"added": 0, "merged": 0, "skipped": 0}
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                pairs = projects_by_country.items() if isinstance(projects_by_country, Mapping) \
+                    else projects_by_country
+                for country, projects in pairs:
+                    for project in projects:
+                        self._add_project(project, country, technology.lower(), seen, counts)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.added += counts["added"]
+            self.merged += counts["merged"]
+            self.skipped += counts["skipped"]
+        return counts
+
+    def _add_project(self, project: Dict[str, Any], country: str, technology: str, seen: str,
+                     counts: Dict[str, int]) -> None:
+        key = name_key(project.get("name")) if _known(project.get("name")) else ""
+        if not key:
+            counts["skipped"] += 1
+            return
+        fields = {
+            "name_key": key,
+            "developer_key": _fold(project.get("developer")) if _known(project.get("developer")) else "",
+            "location_key": _fold(project.get("location")),
+            "capacity_mw": project.get("capacity_mw"),
+            "country": country,
+            "technology": technology,
+        }
+        keys = blocking_keys(technology, key)
+        best: Optional[Tuple[float, sqlite3.Row]] = None
+        for row in self._candidates(keys):
+            score = match_score(fields, row)
+            if score >= MATCH_THRESHOLD and (best is None or score > best[0]):
+                best = (score, row)
+        if best is None:
+            self._insert(project, fields, keys, seen)
+            counts["added"] += 1
+        else:
+            self._merge(best[1]["id"], project, fields, keys, seen)
+            counts["merged"] += 1
+
+    def query(self, text: Optional[str] = None, country: Optional[str] = None,
+              technology: Optional[str] = None, status: Optional[str] = None,
+              category: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Projects matching all given filters, most recently seen first"""
+        where, params = [], []
+        if text and _fts_query(text):
+            where.append("p.id IN (SELECT rowid FROM projects_fts WHERE projects_fts MATCH ?)")
+            params.append(_fts_query(text))
+        if country:
+            # Case-insensitive, like the filters of ResultsQuery
+            where.append("p.country = ? COLLATE NOCASE")
+            params.append(country)
+        if technology:
+            where.append("p.technology = ?")
+            params.append(technology.lower())
+        if status:
+            where.append("p.status_key = ?")
+            params.append(_fold(status))
+        if category:
+            where.append("p.category = ?")
+            params.append(category)
+        sql = "SELECT * FROM projects p"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY p.last_seen DESC, p.id DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_project(row) for row in rows]
+
+    @staticmethod
+    def _row_to_project(row: sqlite3.Row) -> Dict[str, Any]:
+        project = json.loads(row["data"])
+        project.update({
+            "id": row["id"],
+            "country": row["country"],
+            "technology": row["technology"],
+            "first_seen": row["first_seen"],
+            "last_seen": row["last_seen"],
+            "seen_count": row["seen_count"],
+            "sources": json.loads(row["sources"]),
+        })
+        return project
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        return {"projects": total, "added": self.added, "merged": self.merged, "skipped": self.skipped}
+
+
+_shared_index: Optional[ProjectIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_project_index() -> ProjectIndex:
+    """Process-wide project index, created on first use"""
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = ProjectIndex(PROJECT_INDEX_PATH)
+        return _shared_index
@@ -0,0 +1,162 @@
+import base64
+import binascii
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.jobs import JobStore
+from src.store import ResultStore
+
+# Fields the projects endpoint can sort by
+SORT_FIELDS = ("name", "country", "developer", "status", "category", "capacity_mw")
+
+# Parsed runs kept in memory; each one is immutable once its scan has finished
+SNAPSHOT_CACHE_SIZE = 32
+
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that wasn't issued for this query"""
+
+
+class RunSnapshot:
+    """The stored result of one finished region scan, flattened for querying"""
+
+    __slots__ = ("job_id", "summary", "timestamp", "projects")
+
+    def __init__(self, job_id: str, accumulated: Dict[str, Any]):
+        analysis = accumulated.get("analysis", {})
+        self.job_id = job_id
+        self.summary = analysis.get("summary", {})
+        self.timestamp = analysis.get("timestamp")
+        self.projects: List[Dict[str, Any]] = []
+        for country, projects in analysis.get("projects_by_country", {}).items():
+            for project in projects:
+                self.projects.append({**project, "country": country})
+
+
+def _fold(value: Any) -> str:
+    return value.lower() if isinstance(value, str) else ""
+
+
+def _sorted(projects: List[Dict[str, Any]], field: str, descending: bool) -> List[Dict[str, Any]]:
+    if field == "capacity_mw":
+        # Unknown capacities go last in either direction
+        known = [p for p in projects if p.get("capacity_mw") is not None]
+        unknown = [p for p in projects if p.get("capacity_mw") is None]
+        known.sort(key=lambda p: p["capacity_mw"], reverse=descending)
+        return known + unknown
+    return sorted(projects, key=lambda p: _fold(p.get(field)), reverse=descending)
+
+
+def encode_cursor(job_id: str, query_key: str, position: int) -> str:
+    raw = json.dumps([job_id, query_key, position], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        job_id, query_key, position = json.loads(raw)
+        if not isinstance(job_id, str) or not isinstance(query_key, str) or not isinstance(position, int):
+            raise ValueError
+        if isinstance(position, bool) or position < 0:
+            raise ValueError
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursorError("Invalid cursor")
+    return job_id, query_key, position
+
+
+class ResultsQuery:
+    """Filtered, sorted and paginated reads of stored scan results.
+
+    Reads never start a crew run. A cursor pins the run it was issued for,
+    so paging through a result stays consistent even if a newer scan of
+    the same region finishes in between.
+    """
+
+    def __init__(self, jobs: JobStore, store: ResultStore):
+        self.jobs = jobs
+        self.store = store
+        self._snapshots: "OrderedDict[str, RunSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def snapshot(self, job_id: str) -> Optional[RunSnapshot]:
+        with self._lock:
+            cached = self._snapshots.get(job_id)
+            if cached is not None:
+                self._snapshots.move_to_end(job_id)
+                return cached
+        accumulated = self.store.read(job_id, 'accumulated_analysis')
+        if accumulated is None:
+            return None
+        snapshot = RunSnapshot(job_id, accumulated)
+        with self._lock:
+            self._snapshots[job_id] = snapshot
+            while len(self._snapshots) > SNAPSHOT_CACHE_SIZE:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def latest(self, region: str, technology: str) -> Optional[RunSnapshot]:
+        run = self.jobs.get_latest_run(region, technology)
+        return self.snapshot(run["job_id"]) if run else None
+
+    def projects(self, region: str, technology: str, filters: Dict[str, Any],
+                 sort: str = "name", descending: bool = False, limit: int = 50,
+                 cursor: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """One page of projects from the latest run, or from the run a cursor points to.
+
+        Returns None when the region and technology have no stored run.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_FIELDS)}")
+        query_key = hashlib.sha1(json.dumps(
+            [region, technology.lower(), sorted(filters.items()), sort, descending],
+            default=str).encode("utf-8")).hexdigest()[:16]
+
+        position = 0
+        if cursor:
+            job_id, cursor_query, position = decode_cursor(cursor)
+            if cursor_query != query_key:
+                raise InvalidCursorError("Cursor was issued for a different query")
+            snapshot = self.snapshot(job_id)
+            if snapshot is None:
+                raise InvalidCursorError("The run this cursor points to is no longer stored")
+        else:
+            snapshot = self.latest(region, technology)
+            if snapshot is None:
+                return None
+
+        matches = _sorted([p for p in snapshot.projects if self._matches(p, filters)], sort, descending)
+        page = matches[position:position + limit]
+        end = position + len(page)
+        return {
+            "job_id": snapshot.job_id,
+            "timestamp": snapshot.timestamp,
+            "total": len(matches),
+            "projects": page,
+            "next_cursor": encode_cursor(snapshot.job_id, query_key, end) if end < len(matches) else None,
+            "etag": f'W/"{snapshot.job_id}-{query_key}-{position}-{limit}"',
+        }
+
+    @staticmethod
+    def _matches(project: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        country = filters.get("country")
+        if country and _fold(project.get("country")) != country.lower():
+            return False
+        developer = filters.get("developer")
+        if developer and developer.lower() not in _fold(project.get("developer")):
+            return False
+        status = filters.get("status")
+        if status and _fold(project.get("status")) != status.lower():
+            return False
+        category = filters.get("category")
+        if category and _fold(project.get("category")) != category.lower():
+            return False
+        min_capacity = filters.get("min_capacity_mw")
+        if min_capacity is not None:
+            capacity = project.get("capacity_mw")
+            if capacity is None or capacity < min_capacity:
+                return False
+        return True
@@ -0,0 +1,286 @@
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import httpx
+
+from src.config.settings import (
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+    RATE_LIMIT_MAX_RETRIES,
+    SERPER_REQUESTS_PER_MINUTE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Request priorities; lower values are served first
+INTERACTIVE = 0
+BATCH = 1
+
+# Priority of outbound calls made on behalf of the current request or job
+current_priority: ContextVar[int] = ContextVar("current_priority", default=INTERACTIVE)
+
+# Buckets hold this many seconds of a provider's rate, so short bursts don't wait
+BURST_SECONDS = 2
+
+# After a 429 the rate is multiplied by BACKOFF_FACTOR; every success adds RECOVERY_STEP back
+BACKOFF_FACTOR = 0.75
+RECOVERY_STEP = 0.02
+
+# Never throttle below this fraction of the configured rate
+MIN_RATE_FACTOR = 0.1
+
+
+class RateLimitedError(Exception):
+    """The provider answered 429; retry_after is its Retry-After hint in seconds, if any"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait from Retry-After (seconds or HTTP date) or OpenAI's retry-after-ms"""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token buckets for one provider's requests-per-minute and tokens-per-minute limits.
+
+    Callers from any thread wait in a priority queue, so interactive
+    requests go ahead of batch refreshes. A 429 pauses the provider for its
+    Retry-After and lowers the rate; each success then restores the rate a
+    little, which keeps throughput just under the provider's real limit.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float = 0,
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._rate_factor = 1.0
+        self._blocked_until = 0.0
+        self._request_capacity = max(1.0, requests_per_minute / 60 * BURST_SECONDS)
+        self._token_capacity = tokens_per_minute / 60 * BURST_SECONDS if tokens_per_minute else 0.0
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity
+        self._refilled_at = clock()
+        self._stats = {"requests": 0, "tokens": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        factor = self._rate_factor / 60
+        self._requests = min(self._request_capacity,
+                             self._requests + elapsed * self.requests_per_minute * factor)
+        if self.tokens_per_minute:
+            self._tokens = min(self._token_capacity,
+                               self._tokens + elapsed * self.tokens_per_minute * factor)
+
+    def _seconds_until_available(self, tokens: float, now: float) -> float:
+        wait = max(0.0, self._blocked_until - now)
+        factor = self._rate_factor / 60
+        if self._requests < 1:
+            wait = max(wait, (1 - self._requests) / (self.requests_per_minute * factor))
+        if self.tokens_per_minute and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) / (self.tokens_per_minute * factor))
+        return wait
+
+    def acquire(self, tokens: float = 0, priority: Optional[int] = None) -> float:
+        """Block until a request of `tokens` tokens may be sent; returns the seconds waited"""
+        priority = current_priority.get() if priority is None else priority
+        if self.tokens_per_minute:
+            # A request larger than the bucket would never fit; let it through when the bucket is full
+            tokens = min(tokens, self._token_capacity)
+        entry = (priority, next(self._sequence))
+        started = self._clock()
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = self._clock()
+                    self._refill(now)
+                    if self._waiters[0] == entry:
+                        wait = self._seconds_until_available(tokens, now)
+                        if wait <= 0:
+                            heapq.heappop(self._waiters)
+                            self._requests -= 1
+                            self._tokens -= tokens
+                            waited = now - started
+                            self._stats["requests"] += 1
+                            self._stats["tokens"] += int(tokens)
+                            self._stats["wait_seconds"] += waited
+                            self._cond.notify_all()
+                            return waited
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def reconcile(self, estimated: float, actual: float) -> None:
+        """Correct a request's token charge once the provider has reported its real usage"""
+        if not self.tokens_per_minute:
+            return
+        charged = min(estimated, self._token_capacity)
+        with self._cond:
+            # May go negative, which holds the next requests back until the debt is refilled
+            self._tokens -= actual - charged
+            self._stats["tokens"] += int(actual - charged)
+
+    def record_rate_limited(self, retry_after: Optional[float], attempt: int = 0) -> float:
+        """Slow down after a 429; returns how long the provider is paused"""
+        pause = retry_after if retry_after is not None else min(60.0, 2 ** attempt + random.random())
+        with self._cond:
+            self._stats["rate_limited"] += 1
+            now = self._clock()
+            # Concurrent requests rejected in the same burst lower the rate only once
+            if now >= self._blocked_until:
+                self._rate_factor = max(MIN_RATE_FACTOR, self._rate_factor * BACKOFF_FACTOR)
+            self._blocked_until = max(self._blocked_until, now + pause)
+            self._requests = min(self._requests, 0.0)
+            self._cond.notify_all()
+        logger.warning("⏳ %s rate limited, pausing %.1fs (rate now %.0f%%)",
+                       self.name, pause, self._rate_factor * 100)
+        return pause
+
+    def record_success(self) -> None:
+        if self._rate_factor < 1.0:
+            with self._cond:
+                self._rate_factor = min(1.0, self._rate_factor + RECOVERY_STEP)
+
+    def call(self, fn: Callable[..., Any], *args: Any, tokens: float = 0,
+             priority: Optional[int] = None) -> Any:
+        """Run fn(*args) within the limits, retrying when it raises RateLimitedError"""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, priority)
+            try:
+                result = fn(*args)
+            except RateLimitedError as e:
+                self.record_rate_limited(e.retry_after, attempt)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            self.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+            stats["rate_factor"] = round(self._rate_factor, 3)
+            stats["waiting"] = len(self._waiters)
+        return stats
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """httpx transport that sends every request through a RateLimiter.
+
+    Used for OpenAI calls: the prompt size is estimated from the request
+    body and corrected with the usage the response reports, and 429
+    responses are retried here after the provider's Retry-After, so the
+    client only sees one if the retries run out.
+    """
+
+    def __init__(self, limiter: RateLimiter, transport: Optional[httpx.BaseTransport] = None):
+        self.limiter = limiter
+        self.transport = transport or httpx.HTTPTransport()
+
+    @staticmethod
+    def estimate_tokens(request: httpx.Request) -> int:
+        # About four bytes per token of JSON body
+        try:
+            return len(request.content) // 4
+        except httpx.RequestNotRead:
+            return 0
+
+    @staticmethod
+    def used_tokens(response: httpx.Response) -> Optional[int]:
+        """Total tokens from the usage of a JSON completion response; None for streams and errors"""
+        if not response.headers.get("content-type", "").startswith("application/json"):
+            return None
+        try:
+            usage = json.loads(response.read()).get("usage") or {}
+        except (ValueError, AttributeError):
+            return None
+        total = usage.get("total_tokens")
+        return total if isinstance(total, int) else None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = self.estimate_tokens(request)
+        for attempt in range(self.limiter.max_retries + 1):
+            self.limiter.acquire(tokens)
+            response = self.transport.handle_request(request)
+            if response.status_code != 429 or attempt == self.limiter.max_retries:
+                if response.status_code != 429:
+                    self.limiter.record_success()
+                    used = self.used_tokens(response)
+                    if used is not None:
+                        self.limiter.reconcile(tokens, used)
+                return response
+            retry_after = parse_retry_after(response.headers)
+            response.close()
+            self.limiter.record_rate_limited(retry_after, attempt)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+# Limits per provider: requests per minute and tokens per minute
+PROVIDER_LIMITS = {
+    "openai": (OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE),
+    "serper": (SERPER_REQUESTS_PER_MINUTE, 0),
+}
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Process-wide limiter for a provider, created on first use"""
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(provider)
+        if limiter is None:
+            requests_per_minute, tokens_per_minute = PROVIDER_LIMITS[provider]
+            limiter = _shared_limiters[provider] = RateLimiter(provider, requests_per_minute, tokens_per_minute)
+        return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _shared_limiters_lock:
+        limiters = dict(_shared_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Shares one in-flight execution between concurrent callers with the same key.
+
+    The first caller for a key starts the work; callers arriving while it
+    runs await the same result. The shared execution is only cancelled once
+    every caller waiting on it has been cancelled. Progress events are
+    published by the task that started the execution.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            self._waiters[key] = 0
+            self.executions += 1
+            future.add_done_callback(lambda _: self._forget(key, future))
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self._inflight.get(key) is future and self._waiters[key] == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            del self._waiters[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
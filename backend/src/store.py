@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TextIO, Union
+
+from src.config.settings import OUTPUT_DIR, OUTPUT_PRETTY
+
+# Job IDs and artifact names become path components, so keep them to one safe segment
+_SAFE_JOB_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Job ID used for country runs started outside of a job (scripts, benchmarks)
+UNSCOPED_JOB = "unscoped"
+
+
+@contextmanager
+def _atomic_file(path: Path) -> Iterator[TextIO]:
+    """A temporary file next to `path` that replaces it once the block finishes"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path: Union[str, Path], data: Any, pretty: bool = False) -> Path:
+    """Write JSON to a temporary file next to `path` and rename it into place.
+
+    Readers see either the previous file or the complete new one, never a
+    partially written file, even if the process dies mid-write.
+    """
+    path = Path(path)
+    with _atomic_file(path) as f:
+        if pretty:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        else:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+class JsonStream:
+    """A JSON array, or an object when `pairs` is set, whose items are produced on demand.
+
+    The factory is called each time the value is encoded, so the items are
+    read (e.g. from a spill file) only while iter_json writes them out.
+    """
+
+    def __init__(self, factory: Callable[[], Iterable[Any]], pairs: bool = False):
+        self.factory = factory
+        self.pairs = pairs
+
+    def __iter__(self):
+        return iter(self.factory())
+
+
+def iter_json(value: Any) -> Iterator[str]:
+    """Compact JSON for a value in chunks, encoding JsonStream values item by item"""
+    if isinstance(value, JsonStream):
+        yield "{" if value.pairs else "["
+        for i, item in enumerate(value):
+            if i:
+                yield ","
+            if value.pairs:
+                key, item = item
+                yield json.dumps(str(key), ensure_ascii=False) + ":"
+            yield from iter_json(item)
+        yield "}" if value.pairs else "]"
+    elif isinstance(value, dict) and has_json_stream(value):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield ("," if i else "") + json.dumps(str(key), ensure_ascii=False) + ":"
+            yield from iter_json(item)
+        yield "}"
+    else:
+        yield json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def has_json_stream(value: Any) -> bool:
+    """Whether a document contains JsonStream values, directly or in nested dicts"""
+    if isinstance(value, JsonStream):
+        return True
+    return isinstance(value, dict) and any(has_json_stream(item) for item in value.values())
+
+
+def write_json_stream_atomic(path: Union[str, Path], data: Any) -> Path:
+    """write_json_atomic for documents with JsonStream values, written without building them"""
+    path = Path(path)
+    with _atomic_file(path) as f:
+        for chunk in iter_json(data):
+            f.write(chunk)
+    return path
+
+
+class ResultStore:
+    """Run outputs kept per job under <root>/<job_id>/<artifact>.json"""
+
+    def __init__(self, root: Union[str, Path] = OUTPUT_DIR / 'jobs', pretty: bool = OUTPUT_PRETTY):
+        self.root = Path(root)
+        self.pretty = pretty
+
+    def job_dir(self, job_id: str) -> Path:
+        if not _SAFE_JOB_ID.match(job_id):
+            raise ValueError(f"Invalid job ID: {job_id!r}")
+        return self.root / job_id
+
+    def claim(self, job_id: str) -> bool:
+        """Create the directory of a new job; False if the job ID has been used before"""
+        if job_id == UNSCOPED_JOB:
+            return False
+        job_dir = self.job_dir(job_id)
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            # Atomic, so two requests can never claim the same ID
+            job_dir.mkdir()
+        except FileExistsError:
+            return False
+        return True
+
+    def path(self, job_id: str, name: str) -> Path:
+        if not name or name.startswith(".") or "/" in name or "\\" in name:
+            raise ValueError(f"Invalid artifact name: {name!r}")
+        return self.job_dir(job_id) / f"{name}.json"
+
+    def write(self, job_id: Optional[str], name: str, data: Any) -> Path:
+        """Atomically replace one artifact of a job"""
+        path = self.path(job_id or UNSCOPED_JOB, name)
+        if has_json_stream(data):
+            # Streamed documents are always compact; export() makes an indented copy
+            return write_json_stream_atomic(path, data)
+        return write_json_atomic(path, data, self.pretty)
+
+    def read(self, job_id: str, name: str) -> Optional[Any]:
+        try:
+            with open(self.path(job_id, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def list(self, job_id: str) -> List[str]:
+        """Names of the artifacts stored for a job"""
+        job_dir = self.job_dir(job_id)
+        if not job_dir.is_dir():
+            return []
+        return sorted(p.stem for p in job_dir.glob("*.json") if not p.name.startswith("."))
+
+    def export(self, job_id: str, name: str, destination: Union[str, Path]) -> Path:
+        """Write an indented copy of an artifact for reading or sharing"""
+        data = self.read(job_id, name)
+        if data is None:
+            raise FileNotFoundError(self.path(job_id, name))
+        return write_json_atomic(destination, data, pretty=True)
+
+
+_shared_store: Optional[ResultStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Process-wide result store, created on first use"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ResultStore()
+        return _shared_store
@@ -0,0 +1,49 @@
+from typing import Any, Type
+
+from pydantic import BaseModel, Field
+
+try:
+    from crewai.tools import BaseTool
+except ImportError:  # older crewai releases ship BaseTool with crewai_tools
+    from crewai_tools import BaseTool
+
+from src.cache.search import format_results
+
+
+class SearchQuerySchema(BaseModel):
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+
+class CachedSerperDevTool(BaseTool):
+    """Drop-in replacement for SerperDevTool that serves repeated queries from the search cache"""
+
+    name: str = "Search the internet"
+    description: str = "A tool that can be used to search the internet with a search_query."
+    args_schema: Type[BaseModel] = SearchQuerySchema
+    search: Any = None
+    country: str = ""
+    technology: str = ""
+
+    def _run(self, search_query: str, **kwargs: Any) -> str:
+        return format_results(self.search.search(search_query, self.country, self.technology))
+
+
+class WebsiteUrlSchema(BaseModel):
+    website_url: str = Field(..., description="Mandatory website url to read the file")
+
+
+class CachedScrapeWebsiteTool(BaseTool):
+    """Drop-in replacement for ScrapeWebsiteTool that reuses unchanged pages from the scrape cache"""
+
+    name: str = "Read website content"
+    description: str = "A tool that can be used to read a website content."
+    args_schema: Type[BaseModel] = WebsiteUrlSchema
+    scrape_cache: Any = None
+    # Optional PagePreprocessor; when set, only the page's relevant passages are returned
+    preprocessor: Any = None
+
+    def _run(self, website_url: str, **kwargs: Any) -> str:
+        text = self.scrape_cache.fetch_text(website_url)
+        if self.preprocessor is not None:
+            text = self.preprocessor.prepare(text)
+        return f"\nThe following text is scraped website content:\n\n{text}"
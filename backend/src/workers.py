@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from src.config.settings import CREW_TIMEOUT_SECONDS, CREW_WORKERS
+
+
+class CrewTimeoutError(Exception):
+    """Raised when a crew job exceeds the pool's per-job timeout"""
+
+
+class CrewWorkerPool:
+    """Bounded thread pool that keeps blocking crew executions off the event loop.
+
+    Crews hold LLM clients and tool instances that can't be pickled, so a
+    thread pool is used rather than a process pool. A job that times out
+    while queued is dropped; a job that is already running can't be
+    interrupted and keeps its worker until the crew returns.
+    """
+
+    def __init__(self, max_workers: int = CREW_WORKERS, timeout: float = CREW_TIMEOUT_SECONDS):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crew")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+
+    def _job_started(self) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+
+    def _job_finished(self, succeeded: bool) -> None:
+        with self._lock:
+            self._running -= 1
+            if succeeded:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+    def _job_dropped(self, future: Future) -> None:
+        # Jobs cancelled before a worker picked them up never reach _job_started
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _wrap(self, fn: Callable[..., Any], args: Tuple[Any, ...],
+              on_start: Callable[[], None]) -> Callable[[], Any]:
+        def job():
+            self._job_started()
+            on_start()
+            try:
+                result = fn(*args)
+            except BaseException:
+                self._job_finished(succeeded=False)
+                raise
+            self._job_finished(succeeded=True)
+            return result
+        return job
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on a worker thread and await its result.
+
+        The timeout counts from the moment a worker starts the job, so time
+        spent waiting in the queue doesn't count against it.
+        """
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+        with self._lock:
+            self._queued += 1
+        # Run in a copy of the caller's context so job ID and request priority reach the crew
+        context = contextvars.copy_context()
+        future = self._executor.submit(
+            context.run, self._wrap(fn, args, lambda: loop.call_soon_threadsafe(started.set))
+        )
+        future.add_done_callback(self._job_dropped)
+        result = asyncio.wrap_future(future)
+        start_waiter = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait({result, start_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            return await asyncio.wait_for(result, self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise CrewTimeoutError(f"Crew job timed out after {self.timeout}s")
+        finally:
+            start_waiter.cancel()
+            # Cancelled while queued: make sure the job never starts
+            future.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Current queue depth and job counters"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -48,6 +48,7 @@ interface ApiResponse {
 }
 
 type ProgressUpdate = {
+  job_id: string;
   country: string;
   step: string;
 };
@@ -106,14 +107,17 @@ export default function Home() {
     setError("");
     setResult(null);
 
+    // Pick the job ID up front so progress events are scoped to this request
+    const jobId = crypto.randomUUID();
+
     // Set up event source for progress updates
-    const eventSource = new EventSource(`/api/progress`);
+    const eventSource = new EventSource(`/api/progress?job_id=${jobId}`);
 
     eventSource.onmessage = (event: MessageEvent) => {
       const data = JSON.parse(event.data) as ProgressUpdate;
       setProgress(data);
 
-      if (data.step === "complete" || data.step === "error") {
+      if (data.country === "all") {
         eventSource.close();
       }
     };
@@ -121,11 +125,11 @@ export default function Home() {
     try {
       console.log(
         "Fetching from:",
-        `${API_BASE_URL}/api/projects?region=${selectedRegion}&technology=${selectedTechnology}`
+        `${API_BASE_URL}/api/projects?region=${selectedRegion}&technology=${selectedTechnology}&job_id=${jobId}`
       );
 
       const response = await fetch(
-        `${API_BASE_URL}/api/projects?region=${selectedRegion}&technology=${selectedTechnology}`,
+        `${API_BASE_URL}/api/projects?region=${selectedRegion}&technology=${selectedTechnology}&job_id=${jobId}`,
         {
           method: "GET",
           headers: {